@@ -9,14 +9,17 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
+from flask_caching import Cache
 
 from app.config import get_config
-from app.utils.logging import setup_logging, get_logger
+from app.utils.logging import setup_logging, get_logger, audit_logger
+from app.utils.json_provider import OrjsonProvider
 
 # Initialize extensions
 db = SQLAlchemy()
 jwt = JWTManager()
 bcrypt = Bcrypt()
+cache = Cache()
 
 logger = get_logger(__name__)
 
@@ -32,6 +35,7 @@ def create_app(config_class=None):
         Flask: Configured Flask application instance.
     """
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
 
     # Load configuration
     if config_class is None:
@@ -46,6 +50,13 @@ def create_app(config_class=None):
     db.init_app(app)
     jwt.init_app(app)
     bcrypt.init_app(app)
+    cache.init_app(app)
+    audit_logger.init_app(app)
+
+    # Flag lazy-load N+1 queries outside production
+    if app.config.get('NPLUSONE_ENABLED', False):
+        from app.utils.query_monitor import init_query_monitor
+        init_query_monitor(app, db)
 
     # Configure CORS - restrict to specified origins
     cors_origins = app.config.get('CORS_ORIGINS', [])
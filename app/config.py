@@ -27,11 +27,30 @@ class Config:
         f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connection pool - sized per Gunicorn worker process, so pool_size should
+    # cover the worker's thread count; total connections across all workers
+    # (workers * (pool_size + max_overflow)) must stay under MySQL max_connections
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_recycle': 3600,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_recycle': DB_POOL_RECYCLE,
         'pool_pre_ping': True,
     }
 
+    # Caching - set CACHE_REDIS_URL to share the cache across Gunicorn workers;
+    # without it each worker keeps its own in-process cache
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', '')
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'RedisCache' if CACHE_REDIS_URL else 'SimpleCache')
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 300))
+    # Role/status lookups for the auth decorators. Only on by default with a
+    # shared cache: a per-worker cache cannot be invalidated in other workers,
+    # which would keep serving a changed role or status until the timeout.
+    AUTH_USER_CACHE = os.getenv('AUTH_USER_CACHE', 'True' if CACHE_REDIS_URL else 'False').lower() == 'true'
+    AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(
@@ -55,8 +74,27 @@ class Config:
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'logs/app.log')
-    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10485760))
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10485760))  # 0 = leave rotation to logrotate
     LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+    LOG_ASYNC = os.getenv('LOG_ASYNC', 'True').lower() == 'true'  # Write logs from a listener thread
+    LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', 0.5))  # Buffer log file writes; 0 = write through
+    LOG_REQUEST_START = os.getenv('LOG_REQUEST_START', 'False').lower() == 'true'  # Also log when requests start
+
+    # Audit trail - queue entries and insert them in batches off the request path
+    AUDIT_ASYNC = os.getenv('AUDIT_ASYNC', 'True').lower() == 'true'
+    AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 100))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', 0.1))
+    AUDIT_QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', 10000))
+
+    # Create technician user accounts (bcrypt hash + insert) in a background thread.
+    # Off by default: the client gets 202 before the account exists, and a
+    # failure is only recorded in the audit trail (user_provisioning_failed)
+    USER_PROVISIONING_ASYNC = os.getenv('USER_PROVISIONING_ASYNC', 'False').lower() == 'true'
+    USER_PROVISIONING_WORKERS = int(os.getenv('USER_PROVISIONING_WORKERS', 2))
+
+    # Query diagnostics - warn (or raise) on repeated lazy loads (N+1 queries)
+    NPLUSONE_ENABLED = False
+    NPLUSONE_RAISE = False
 
     # Application
     APP_NAME = os.getenv('APP_NAME', 'Work Tracking System')
@@ -68,6 +106,7 @@ class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
     LOG_LEVEL = 'DEBUG'
+    NPLUSONE_ENABLED = True
 
 
 class ProductionConfig(Config):
@@ -81,7 +120,16 @@ class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # In-memory SQLite uses a static single-connection pool
+    BCRYPT_LOG_ROUNDS = 4
+    CACHE_TYPE = 'NullCache'
+    AUDIT_ASYNC = False  # Write audit entries inline so tests can assert on them
+    LOG_ASYNC = False
+    LOG_FLUSH_INTERVAL = 0
+    USER_PROVISIONING_ASYNC = False
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=5)
+    NPLUSONE_ENABLED = True
+    NPLUSONE_RAISE = True
 
 
 config_by_name = {
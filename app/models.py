@@ -9,6 +9,9 @@ from app import db
 class Technician(db.Model):
     """Technician/team member model."""
     __tablename__ = 'technicians'
+    __table_args__ = (
+        db.Index('idx_status_name', 'status', 'name'),
+    )
 
     tech_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(100), nullable=False)
@@ -24,16 +27,27 @@ class Technician(db.Model):
     time_entries = db.relationship('TimeEntry', backref='technician', lazy='dynamic')
     user = db.relationship('User', backref='technician', uselist=False)
 
+    # Columns serialized by fields_to_dict(); projection queries select these
+    DICT_FIELDS = ('tech_id', 'name', 'email', 'phone', 'hourly_rate', 'status', 'hire_date', 'created_at')
+
     def to_dict(self):
+        return self.fields_to_dict(self)
+
+    @staticmethod
+    def fields_to_dict(source):
+        """
+        Serialize technician fields from a Technician or from a result row
+        with the DICT_FIELDS columns, so both give the same response shape.
+        """
         return {
-            'tech_id': self.tech_id,
-            'name': self.name,
-            'email': self.email,
-            'phone': self.phone,
-            'hourly_rate': float(self.hourly_rate) if self.hourly_rate else 0,
-            'status': self.status,
-            'hire_date': self.hire_date.isoformat() if self.hire_date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'tech_id': source.tech_id,
+            'name': source.name,
+            'email': source.email,
+            'phone': source.phone,
+            'hourly_rate': float(source.hourly_rate) if source.hourly_rate else 0,
+            'status': source.status,
+            'hire_date': source.hire_date.isoformat() if source.hire_date else None,
+            'created_at': source.created_at.isoformat() if source.created_at else None,
         }
 
 
@@ -160,6 +174,10 @@ class PayPeriod(db.Model):
 class TimeEntry(db.Model):
     """Time entry model for tracking work hours."""
     __tablename__ = 'time_entries'
+    __table_args__ = (
+        db.Index('idx_tech_date', 'tech_id', 'date_worked'),
+        db.Index('idx_status_date', 'status', 'date_worked'),
+    )
 
     entry_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     job_id = db.Column(db.Integer, db.ForeignKey('jobs.job_id'), nullable=False)
@@ -195,14 +213,18 @@ class TimeEntry(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def to_dict(self):
+        # Resolve each relationship once; every attribute access goes
+        # through the instrumented descriptor
+        job = self.job
+        technician = self.technician
         return {
             'entry_id': self.entry_id,
             'job_id': self.job_id,
-            'job_ticket': self.job.ticket_number if self.job else None,
-            'job_title': self.job.description if self.job else None,
-            'job_client': self.job.client_name if self.job else None,
+            'job_ticket': job.ticket_number if job else None,
+            'job_title': job.description if job else None,
+            'job_client': job.client_name if job else None,
             'tech_id': self.tech_id,
-            'tech_name': self.technician.name if self.technician else None,
+            'tech_name': technician.name if technician else None,
             'period_id': self.period_id,
             'date_worked': self.date_worked.isoformat() if self.date_worked else None,
             'time_in': self.time_in.isoformat() if self.time_in else None,
@@ -224,7 +246,7 @@ class User(db.Model):
     __tablename__ = 'users'
 
     user_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    tech_id = db.Column(db.Integer, db.ForeignKey('technicians.tech_id'))
+    tech_id = db.Column(db.Integer, db.ForeignKey('technicians.tech_id'), unique=True)
     email = db.Column(db.String(100), nullable=False, unique=True)
     password_hash = db.Column(db.String(255), nullable=False)
     full_name = db.Column(db.String(100))
@@ -342,6 +364,9 @@ class SystemSettings(db.Model):
 class MileageRateHistory(db.Model):
     """Historical mileage rates for accurate pay calculation on past entries."""
     __tablename__ = 'mileage_rate_history'
+    __table_args__ = (
+        db.Index('idx_open_rate', 'end_date', 'effective_date'),
+    )
 
     rate_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     rate_per_mile = db.Column(db.Numeric(6, 4), nullable=False)
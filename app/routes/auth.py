@@ -16,9 +16,11 @@ from app.utils.logging import get_logger, audit_logger
 from app.utils.auth import (
     jwt_required_with_user,
     admin_required,
+    invalidate_auth_user,
     rate_limiter,
     validate_password_strength,
 )
+from app.utils.users import hash_password
 
 auth_bp = Blueprint('auth', __name__)
 logger = get_logger(__name__)
@@ -158,7 +160,7 @@ def register():
             return jsonify({'error': 'Technician already has an account'}), 409
 
     # Create user
-    password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+    password_hash = hash_password(password)
 
     user = User(
         email=email,
@@ -261,9 +263,7 @@ def update_profile():
         if not is_valid:
             return jsonify({'error': error_msg}), 400
 
-        user.password_hash = bcrypt.generate_password_hash(
-            data['new_password']
-        ).decode('utf-8')
+        user.password_hash = hash_password(data['new_password'])
         user.password_changed_at = datetime.utcnow()
 
     db.session.commit()
@@ -354,6 +354,7 @@ def update_user(user_id):
         user.full_name = data['full_name'].strip()
 
     db.session.commit()
+    invalidate_auth_user(user.user_id)
 
     audit_logger.log(
         action_type='user_updated',
@@ -398,9 +399,7 @@ def reset_user_password(user_id):
     if not is_valid:
         return jsonify({'error': error_msg}), 400
 
-    user.password_hash = bcrypt.generate_password_hash(
-        data['new_password']
-    ).decode('utf-8')
+    user.password_hash = hash_password(data['new_password'])
     user.password_changed_at = datetime.utcnow()
 
     db.session.commit()
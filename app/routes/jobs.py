@@ -4,6 +4,7 @@ Job management routes for creating, updating, and querying jobs.
 from datetime import datetime
 from flask import Blueprint, request, jsonify, g
 from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
 from app import db
 from app.models import Job, Platform, TimeEntry
 from app.utils.logging import get_logger, audit_logger, log_action
@@ -36,7 +37,8 @@ def list_jobs():
     from_date = request.args.get('from_date')
     to_date = request.args.get('to_date')
 
-    query = Job.query
+    # to_dict() reads each job's platform
+    query = Job.query.options(selectinload(Job.platform))
 
     # Apply filters
     if status:
@@ -296,7 +298,8 @@ def get_job_time_entries(job_id):
     """Get all time entries for a specific job."""
     job = Job.query.get_or_404(job_id)
 
-    time_entries = TimeEntry.query.filter_by(job_id=job_id)\
+    time_entries = TimeEntry.query.options(selectinload(TimeEntry.technician))\
+        .filter_by(job_id=job_id)\
         .order_by(TimeEntry.date_worked.desc())\
         .all()
 
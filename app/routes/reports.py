@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from flask import Blueprint, request, jsonify, g
 from sqlalchemy import func, and_
+from sqlalchemy.orm import selectinload
 from app import db
 from app.models import (
     TimeEntry, Job, Technician, Platform, PayPeriod, AuditLog, User
@@ -162,6 +163,16 @@ def payroll_detail_report():
             tech_jobs[entry.tech_id] = set()
         tech_jobs[entry.tech_id].add(entry.job_id)
 
+    # Load every job once, with the platform its pay breakdown reports
+    jobs = {}
+    if entries:
+        jobs = {
+            job.job_id: job
+            for job in Job.query.options(selectinload(Job.platform)).filter(
+                Job.job_id.in_({entry.job_id for entry in entries})
+            )
+        }
+
     # Build detailed report for each technician
     technicians_report = []
     grand_totals = {
@@ -195,7 +206,7 @@ def payroll_detail_report():
         }
 
         for job_id in job_ids:
-            job = Job.query.get(job_id)
+            job = jobs.get(job_id)
             if not job:
                 continue
 
@@ -215,10 +226,9 @@ def payroll_detail_report():
                 continue
 
             # Get entry dates for this tech on this job
-            tech_entries = [e for e in tech_pay['entries']]
-            entry_dates = sorted(set(
-                e['date_worked'] for e in tech_entries if e.get('date_worked')
-            ))
+            entry_dates = sorted({
+                e['date_worked'] for e in tech_pay['entries'] if e.get('date_worked')
+            })
 
             # Format date display: single date or range
             if len(entry_dates) == 0:
@@ -277,16 +287,16 @@ def payroll_detail_report():
             tech_data['totals']['total_pay'] += Decimal(str(tech_pay['total_pay']))
             tech_data['totals']['total_profit_share'] += tech_profit_share
 
+        # Update grand totals from the Decimal totals before converting them
+        for key in grand_totals:
+            grand_totals[key] += tech_data['totals'][key]
+
         # Convert tech totals to float
         tech_data['totals'] = {k: float(v) for k, v in tech_data['totals'].items()}
 
         # Sort jobs by first entry date
         tech_data['jobs'].sort(key=lambda j: j['entry_dates'][0] if j['entry_dates'] else '')
 
-        # Update grand totals
-        for key in grand_totals:
-            grand_totals[key] += Decimal(str(tech_data['totals'][key]))
-
         technicians_report.append(tech_data)
 
     # Sort technicians by name
@@ -330,7 +340,7 @@ def income_expense_report():
         return jsonify({'error': 'Date range required'}), 400
 
     # Get jobs in date range with verified time entries
-    jobs_query = Job.query.filter(
+    jobs_query = Job.query.options(selectinload(Job.platform)).filter(
         Job.job_date >= from_date,
         Job.job_date <= to_date
     ).all()
@@ -347,7 +357,7 @@ def income_expense_report():
 
     for job in jobs_query:
         # Calculate tech pay for this job
-        pay_data = calculate_job_pay(job.job_id)
+        pay_data = calculate_job_pay(job.job_id, include_entries=False)
         tech_pay = Decimal('0')
         if pay_data and pay_data.get('totals'):
             tech_pay = Decimal(str(pay_data['totals'].get('total_pay', 0)))
@@ -479,11 +489,18 @@ def technician_hours_report():
         # Group by week
         entries = base_query.order_by(TimeEntry.date_worked).all()
         weeks = {}
+        last_week_ordinal = None
+        week_key = None
 
         for entry in entries:
-            # Get week start (Monday)
-            week_start = entry.date_worked - timedelta(days=entry.date_worked.weekday())
-            week_key = week_start.isoformat()
+            # Entries are ordered by date, so only recompute the week start
+            # (Monday) when the entry falls into a new week. Ordinal 1 is a
+            # Monday, so (ordinal - 1) // 7 is constant within a Mon-Sun week.
+            week_ordinal = (entry.date_worked.toordinal() - 1) // 7
+            if week_ordinal != last_week_ordinal:
+                last_week_ordinal = week_ordinal
+                week_start = entry.date_worked - timedelta(days=entry.date_worked.weekday())
+                week_key = week_start.isoformat()
 
             if week_key not in weeks:
                 weeks[week_key] = {
@@ -702,7 +719,8 @@ def audit_log_report():
     from_date = request.args.get('from_date')
     to_date = request.args.get('to_date')
 
-    query = AuditLog.query
+    # to_dict() reads each entry's user
+    query = AuditLog.query.options(selectinload(AuditLog.user))
 
     if user_id:
         query = query.filter(AuditLog.user_id == user_id)
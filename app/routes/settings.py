@@ -1,17 +1,25 @@
 """
 System settings and pay calculation routes.
 """
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify, g
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models import SystemSettings, MileageRateHistory
+from app.utils.cache import cache_get, cache_set, cache_delete
 from app.utils.logging import get_logger, audit_logger
 from app.utils.auth import jwt_required_with_user, admin_required, manager_required
-from app.utils.pay_calculator import calculate_job_pay, calculate_tech_pay_summary
+from app.utils.pay_calculator import calculate_job_pay, calculate_tech_pay_summary, get_mileage_rate
+from app.utils.dates import parse_iso_date
 
 settings_bp = Blueprint('settings', __name__)
 logger = get_logger(__name__)
 
+# Cache keys for read-mostly settings data (invalidated on every write below)
+SETTINGS_LIST_CACHE_KEY = 'settings:list'
+SETTING_CACHE_KEY = 'setting:{key}'
+
 
 # ============ System Settings ============
 
@@ -19,9 +27,27 @@ logger = get_logger(__name__)
 @manager_required
 def list_settings():
     """List all system settings."""
-    settings = SystemSettings.query.all()
+    settings = cache_get(SETTINGS_LIST_CACHE_KEY)
+    if settings is None:
+        # Column-only projection: plain rows, no ORM instances to hydrate
+        rows = db.session.execute(select(
+            SystemSettings.setting_id,
+            SystemSettings.setting_key,
+            SystemSettings.setting_value,
+            SystemSettings.description,
+            SystemSettings.effective_date,
+        )).all()
+        settings = [{
+            'setting_id': row.setting_id,
+            'setting_key': row.setting_key,
+            'setting_value': row.setting_value,
+            'description': row.description,
+            'effective_date': row.effective_date.isoformat() if row.effective_date else None,
+        } for row in rows]
+        cache_set(SETTINGS_LIST_CACHE_KEY, settings, timeout=300)
+
     return jsonify({
-        'settings': [s.to_dict() for s in settings]
+        'settings': settings
     }), 200
 
 
@@ -29,10 +55,16 @@ def list_settings():
 @jwt_required_with_user
 def get_setting(key):
     """Get a specific setting by key."""
-    setting = SystemSettings.query.filter_by(setting_key=key).first()
-    if not setting:
-        return jsonify({'error': 'Setting not found'}), 404
-    return jsonify({'setting': setting.to_dict()}), 200
+    cache_key = SETTING_CACHE_KEY.format(key=key)
+    setting_data = cache_get(cache_key)
+    if setting_data is None:
+        setting = SystemSettings.query.filter_by(setting_key=key).first()
+        if not setting:
+            return jsonify({'error': 'Setting not found'}), 404
+        setting_data = setting.to_dict()
+        cache_set(cache_key, setting_data, timeout=300)
+
+    return jsonify({'setting': setting_data}), 200
 
 
 @settings_bp.route('', methods=['POST'])
@@ -59,12 +91,9 @@ def create_setting():
     if not key or not value:
         return jsonify({'error': 'Setting key and value required'}), 400
 
-    if SystemSettings.query.filter_by(setting_key=key).first():
-        return jsonify({'error': 'Setting already exists'}), 409
-
     effective_date = None
     if data.get('effective_date'):
-        effective_date = datetime.strptime(data['effective_date'], '%Y-%m-%d').date()
+        effective_date = parse_iso_date(data['effective_date'])
 
     setting = SystemSettings(
         setting_key=key,
@@ -74,19 +103,30 @@ def create_setting():
     )
 
     db.session.add(setting)
-    db.session.commit()
+
+    # Duplicate keys are rejected by the unique constraint on setting_key
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Setting already exists'}), 409
+
+    cache_delete(SETTINGS_LIST_CACHE_KEY, SETTING_CACHE_KEY.format(key=key))
+
+    # Serialize once for both the audit entry and the response
+    setting_data = setting.to_dict()
 
     audit_logger.log(
         action_type='setting_created',
         entity_type='system_setting',
         entity_id=setting.setting_id,
-        new_values=setting.to_dict(),
+        new_values=setting_data,
         user_id=g.user_id
     )
 
     return jsonify({
         'message': 'Setting created',
-        'setting': setting.to_dict()
+        'setting': setting_data
     }), 201
 
 
@@ -112,24 +152,28 @@ def update_setting(key):
 
     if 'effective_date' in data:
         if data['effective_date']:
-            setting.effective_date = datetime.strptime(data['effective_date'], '%Y-%m-%d').date()
+            setting.effective_date = parse_iso_date(data['effective_date'])
         else:
             setting.effective_date = None
 
     db.session.commit()
+    cache_delete(SETTINGS_LIST_CACHE_KEY, SETTING_CACHE_KEY.format(key=key))
+
+    # Serialize once for both the audit entry and the response
+    setting_data = setting.to_dict()
 
     audit_logger.log(
         action_type='setting_updated',
         entity_type='system_setting',
         entity_id=setting.setting_id,
         old_values=old_values,
-        new_values=setting.to_dict(),
+        new_values=setting_data,
         user_id=g.user_id
     )
 
     return jsonify({
         'message': 'Setting updated',
-        'setting': setting.to_dict()
+        'setting': setting_data
     }), 200
 
 
@@ -168,18 +212,18 @@ def create_mileage_rate():
     if rate is None or not effective_date:
         return jsonify({'error': 'Rate and effective date required'}), 400
 
-    effective_date = datetime.strptime(effective_date, '%Y-%m-%d').date()
-
-    # Close any existing open-ended rate
-    open_rate = MileageRateHistory.query.filter(
-        MileageRateHistory.end_date.is_(None),
-        MileageRateHistory.effective_date < effective_date
-    ).first()
-
-    if open_rate:
-        # Set end date to day before new rate starts
-        from datetime import timedelta
-        open_rate.end_date = effective_date - timedelta(days=1)
+    effective_date = parse_iso_date(effective_date)
+
+    # Close any existing open-ended rate, ending it the day before the new
+    # rate starts (single atomic UPDATE rather than SELECT-then-UPDATE)
+    db.session.execute(
+        update(MileageRateHistory)
+        .where(
+            MileageRateHistory.end_date.is_(None),
+            MileageRateHistory.effective_date < effective_date
+        )
+        .values(end_date=effective_date - timedelta(days=1))
+    )
 
     new_rate = MileageRateHistory(
         rate_per_mile=rate,
@@ -190,17 +234,20 @@ def create_mileage_rate():
     db.session.add(new_rate)
     db.session.commit()
 
+    # Serialize once for both the audit entry and the response
+    rate_data = new_rate.to_dict()
+
     audit_logger.log(
         action_type='mileage_rate_created',
         entity_type='mileage_rate',
         entity_id=new_rate.rate_id,
-        new_values=new_rate.to_dict(),
+        new_values=rate_data,
         user_id=g.user_id
     )
 
     return jsonify({
         'message': 'Mileage rate created',
-        'mileage_rate': new_rate.to_dict()
+        'mileage_rate': rate_data
     }), 201
 
 
@@ -208,9 +255,8 @@ def create_mileage_rate():
 @jwt_required_with_user
 def get_current_mileage_rate():
     """Get the current effective mileage rate."""
-    rate = MileageRateHistory.get_rate_for_date(datetime.utcnow().date())
     return jsonify({
-        'rate_per_mile': rate
+        'rate_per_mile': get_mileage_rate(datetime.utcnow().date())
     }), 200
 
 
@@ -240,9 +286,11 @@ def get_tech_pay(tech_id):
     Query parameters:
         - start_date: Filter entries from this date
         - end_date: Filter entries until this date
+        - include_entries: 'false' to leave out the time entries on each job
     """
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
+    include_entries = request.args.get('include_entries', 'true').lower() != 'false'
 
-    result = calculate_tech_pay_summary(tech_id, start_date, end_date)
+    result = calculate_tech_pay_summary(tech_id, start_date, end_date, include_entries=include_entries)
     return jsonify(result), 200
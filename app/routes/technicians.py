@@ -2,16 +2,64 @@
 Technician management routes.
 Every technician can have a linked user account.
 """
-from datetime import datetime
-from flask import Blueprint, request, jsonify, g
-from app import db, bcrypt
+import re
+from flask import Blueprint, request, jsonify, g, current_app
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from app import db
 from app.models import Technician, User
 from app.utils.logging import get_logger, audit_logger
-from app.utils.auth import jwt_required_with_user, admin_required, validate_password_strength
+from app.utils.auth import (
+    jwt_required_with_user,
+    admin_required,
+    invalidate_auth_user,
+    validate_password_strength,
+)
+from app.utils.users import hash_password, create_user_for_tech, enqueue_user_provisioning
 
 technicians_bp = Blueprint('technicians', __name__)
 logger = get_logger(__name__)
 
+# Unique violation on users.tech_id: MySQL names the key (idx_tech_id),
+# SQLite the column; anything else on users is the email
+_TECH_ID_CONFLICT_RE = re.compile(r"for key '(?:users\.)?idx_tech_id'|users\.tech_id")
+
+# Columns the technician endpoints return, shared with Technician.to_dict().
+# Reads project exactly these (with the linked user joined in the same
+# SELECT), so a field added there is loaded by the one query rather than by
+# a per-row lazy load.
+TECHNICIAN_COLUMNS = tuple(getattr(Technician, field) for field in Technician.DICT_FIELDS)
+LINKED_USER_COLUMNS = (
+    User.user_id,
+    User.email.label('user_email'),
+    User.status.label('user_status'),
+)
+
+
+def _technician_query():
+    """Build the technician projection query with the linked user outer-joined."""
+    return db.session.query(*TECHNICIAN_COLUMNS, *LINKED_USER_COLUMNS).outerjoin(
+        User, User.tech_id == Technician.tech_id
+    )
+
+
+def _technician_row_to_dict(row):
+    """
+    Convert a _technician_query() row to the technician response dict.
+
+    Args:
+        row: Result row with the technician and linked user columns
+
+    Returns:
+        dict: Technician fields plus linked user info
+    """
+    tech_dict = Technician.fields_to_dict(row)
+    tech_dict['has_user_account'] = row.user_id is not None
+    if row.user_id is not None:
+        tech_dict['user_email'] = row.user_email
+        tech_dict['user_id'] = row.user_id
+    return tech_dict
+
 
 @technicians_bp.route('', methods=['GET'])
 @jwt_required_with_user
@@ -22,10 +70,11 @@ def list_technicians():
     status = request.args.get('status')
     search = request.args.get('search', '').strip()
 
-    query = Technician.query
+    # Plain rows from one narrow SELECT instead of ORM objects
+    query = _technician_query()
 
     if status:
-        query = query.filter_by(status=status)
+        query = query.filter(Technician.status == status)
 
     if search:
         search_term = f"%{search}%"
@@ -40,17 +89,7 @@ def list_technicians():
 
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
-    # Include linked user info
-    technicians_data = []
-    for tech in pagination.items:
-        tech_dict = tech.to_dict()
-        # Check if technician has a linked user
-        linked_user = User.query.filter_by(tech_id=tech.tech_id).first()
-        tech_dict['has_user_account'] = linked_user is not None
-        if linked_user:
-            tech_dict['user_email'] = linked_user.email
-            tech_dict['user_id'] = linked_user.user_id
-        technicians_data.append(tech_dict)
+    technicians_data = [_technician_row_to_dict(row) for row in pagination.items]
 
     return jsonify({
         'technicians': technicians_data,
@@ -64,16 +103,10 @@ def list_technicians():
 @jwt_required_with_user
 def get_technician(tech_id):
     """Get a specific technician."""
-    tech = Technician.query.get_or_404(tech_id)
-    tech_dict = tech.to_dict()
-
-    # Include linked user info
-    linked_user = User.query.filter_by(tech_id=tech.tech_id).first()
-    tech_dict['has_user_account'] = linked_user is not None
-    if linked_user:
-        tech_dict['user_email'] = linked_user.email
-        tech_dict['user_id'] = linked_user.user_id
-        tech_dict['user_status'] = linked_user.status
+    row = _technician_query().filter(Technician.tech_id == tech_id).first_or_404()
+    tech_dict = _technician_row_to_dict(row)
+    if row.user_id is not None:
+        tech_dict['user_status'] = row.user_status
 
     return jsonify({'technician': tech_dict}), 200
 
@@ -93,6 +126,10 @@ def create_technician():
             "create_user_account": true,
             "password": "Password123"  (required if create_user_account is true)
         }
+
+    With USER_PROVISIONING_ASYNC enabled, the user account is created in the
+    background and the response is 202 with "status": "provisioning". A
+    failure is recorded in the audit log as user_provisioning_failed.
     """
     data = request.get_json()
 
@@ -105,81 +142,91 @@ def create_technician():
     if not name:
         return jsonify({'error': 'Name is required'}), 400
 
-    # Check for duplicate email in technicians
-    if email:
-        existing_tech = Technician.query.filter_by(email=email).first()
-        if existing_tech:
-            return jsonify({'error': 'A technician with this email already exists'}), 409
-
-    # Create technician
-    tech = Technician(
-        name=name,
-        email=email or None,
-        phone=data.get('phone', '').strip() or None,
-        hourly_rate=data.get('hourly_rate') or None,
-        status=data.get('status', 'active')
-    )
-
-    db.session.add(tech)
-    db.session.flush()  # Get the tech_id
-
-    # Optionally create user account
-    user = None
-    if data.get('create_user_account'):
+    # Validate and hash user account credentials before any inserts so the
+    # bcrypt cost is not paid while the new rows are pending
+    create_user_account = bool(data.get('create_user_account'))
+    provision_async = current_app.config.get('USER_PROVISIONING_ASYNC', False)
+    password = None
+    password_hash = None
+    if create_user_account:
         if not email:
-            db.session.rollback()
             return jsonify({'error': 'Email is required to create a user account'}), 400
 
         password = data.get('password', '')
         if not password:
-            db.session.rollback()
             return jsonify({'error': 'Password is required to create a user account'}), 400
 
         # Validate password
         is_valid, error_msg = validate_password_strength(password)
         if not is_valid:
-            db.session.rollback()
             return jsonify({'error': error_msg}), 400
 
         # Check if user with this email exists
         existing_user = User.query.filter_by(email=email).first()
         if existing_user:
-            db.session.rollback()
             return jsonify({'error': 'A user with this email already exists'}), 409
 
-        password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        if not provision_async:
+            password_hash = hash_password(password)
 
-        user = User(
-            email=email,
-            password_hash=password_hash,
-            full_name=name,
-            role='technician',
-            tech_id=tech.tech_id,
-            password_changed_at=datetime.utcnow()
-        )
-        db.session.add(user)
+    # Create technician
+    tech = Technician(
+        name=name,
+        email=email or None,
+        phone=data.get('phone', '').strip() or None,
+        hourly_rate=data.get('hourly_rate') or None,
+        status=data.get('status', 'active')
+    )
 
-    db.session.commit()
+    db.session.add(tech)
+
+    # Duplicate technician emails are rejected by the unique constraint
+    try:
+        db.session.flush()  # Get the tech_id
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'A technician with this email already exists'}), 409
+
+    # Optionally create user account
+    user = None
+    if password_hash:
+        user = create_user_for_tech(tech, email, password_hash)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # User email taken between the check above and the insert
+        db.session.rollback()
+        return jsonify({'error': 'A user with this email already exists'}), 409
+
+    # Serialize once for both the audit entry and the response
+    tech_data = tech.to_dict()
 
     logger.info(f"Technician created: {tech.tech_id} - {tech.name}")
     audit_logger.log(
         action_type='technician_created',
         entity_type='technician',
         entity_id=tech.tech_id,
-        new_values=tech.to_dict(),
+        new_values=tech_data,
         description=f"Technician {tech.name} created",
         user_id=g.user_id
     )
 
     response_data = {
         'message': 'Technician created successfully',
-        'technician': tech.to_dict()
+        'technician': tech_data
     }
 
     if user:
         response_data['user'] = user.to_dict()
         response_data['message'] = 'Technician and user account created successfully'
 
+    if create_user_account and provision_async:
+        enqueue_user_provisioning(tech.tech_id, email, password, g.user_id)
+        response_data['status'] = 'provisioning'
+        response_data['message'] = 'Technician created; user account is being provisioned'
+        return jsonify(response_data), 202
+
     return jsonify(response_data), 201
 
 
@@ -198,7 +245,7 @@ def update_technician(tech_id):
             "status": "active"
         }
     """
-    tech = Technician.query.get_or_404(tech_id)
+    tech = db.get_or_404(Technician, tech_id)
     data = request.get_json()
 
     if not data:
@@ -211,15 +258,7 @@ def update_technician(tech_id):
         tech.name = data['name'].strip()
 
     if 'email' in data:
-        new_email = data['email'].strip().lower() if data['email'] else None
-        if new_email and new_email != tech.email:
-            existing = Technician.query.filter(
-                Technician.email == new_email,
-                Technician.tech_id != tech_id
-            ).first()
-            if existing:
-                return jsonify({'error': 'A technician with this email already exists'}), 409
-        tech.email = new_email
+        tech.email = data['email'].strip().lower() if data['email'] else None
 
     if 'phone' in data:
         tech.phone = data['phone'].strip() or None
@@ -232,7 +271,15 @@ def update_technician(tech_id):
             return jsonify({'error': 'Invalid status'}), 400
         tech.status = data['status']
 
-    db.session.commit()
+    # Duplicate technician emails are rejected by the unique constraint
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'A technician with this email already exists'}), 409
+
+    # Serialize once for both the audit entry and the response
+    tech_data = tech.to_dict()
 
     logger.info(f"Technician updated: {tech.tech_id}")
     audit_logger.log(
@@ -240,14 +287,14 @@ def update_technician(tech_id):
         entity_type='technician',
         entity_id=tech.tech_id,
         old_values=old_values,
-        new_values=tech.to_dict(),
+        new_values=tech_data,
         description=f"Technician {tech.name} updated",
         user_id=g.user_id
     )
 
     return jsonify({
         'message': 'Technician updated successfully',
-        'technician': tech.to_dict()
+        'technician': tech_data
     }), 200
 
 
@@ -257,17 +304,19 @@ def delete_technician(tech_id):
     """
     Deactivate a technician (soft delete).
     """
-    tech = Technician.query.get_or_404(tech_id)
+    tech = db.get_or_404(Technician, tech_id, options=[joinedload(Technician.user)])
 
     old_values = tech.to_dict()
     tech.status = 'inactive'
 
     # Also deactivate linked user if exists
-    linked_user = User.query.filter_by(tech_id=tech_id).first()
+    linked_user = tech.user
     if linked_user:
         linked_user.status = 'inactive'
 
     db.session.commit()
+    if linked_user:
+        invalidate_auth_user(linked_user.user_id)
 
     logger.info(f"Technician deactivated: {tech.tech_id}")
     audit_logger.log(
@@ -295,11 +344,10 @@ def create_user_for_technician(tech_id):
             "email": "override@example.com"  (optional, uses technician email by default)
         }
     """
-    tech = Technician.query.get_or_404(tech_id)
+    tech = db.get_or_404(Technician, tech_id, options=[joinedload(Technician.user)])
 
     # Check if technician already has a user account
-    existing_user = User.query.filter_by(tech_id=tech_id).first()
-    if existing_user:
+    if tech.user is not None:
         return jsonify({'error': 'Technician already has a user account'}), 409
 
     data = request.get_json()
@@ -323,19 +371,17 @@ def create_user_for_technician(tech_id):
     if User.query.filter_by(email=email).first():
         return jsonify({'error': 'A user with this email already exists'}), 409
 
-    password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
-
-    user = User(
-        email=email,
-        password_hash=password_hash,
-        full_name=tech.name,
-        role='technician',
-        tech_id=tech.tech_id,
-        password_changed_at=datetime.utcnow()
-    )
+    user = create_user_for_tech(tech, email, hash_password(password))
 
-    db.session.add(user)
-    db.session.commit()
+    # The checks above avoid a wasted bcrypt hash; the unique constraints on
+    # users.email and users.tech_id still catch concurrent creates
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if _TECH_ID_CONFLICT_RE.search(str(e.orig)):
+            return jsonify({'error': 'Technician already has a user account'}), 409
+        return jsonify({'error': 'A user with this email already exists'}), 409
 
     logger.info(f"User account created for technician: {tech.tech_id}")
     audit_logger.log(
@@ -364,18 +410,13 @@ def link_user_to_technician(tech_id):
             "user_id": 5
         }
     """
-    tech = Technician.query.get_or_404(tech_id)
-
-    # Check if technician already has a linked user
-    existing_link = User.query.filter_by(tech_id=tech_id).first()
-    if existing_link:
-        return jsonify({'error': 'Technician already has a linked user account'}), 409
+    tech = db.get_or_404(Technician, tech_id)
 
     data = request.get_json()
     if not data or 'user_id' not in data:
         return jsonify({'error': 'user_id is required'}), 400
 
-    user = User.query.get(data['user_id'])
+    user = db.session.get(User, data['user_id'])
     if not user:
         return jsonify({'error': 'User not found'}), 404
 
@@ -384,7 +425,12 @@ def link_user_to_technician(tech_id):
 
     user.tech_id = tech_id
 
-    db.session.commit()
+    # A technician can only have one linked user (unique users.tech_id)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Technician already has a linked user account'}), 409
 
     audit_logger.log(
         action_type='user_linked_to_technician',
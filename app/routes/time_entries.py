@@ -5,10 +5,12 @@ Includes creation, updates, verification, and submission workflows.
 from datetime import datetime, timedelta
 from decimal import Decimal
 from flask import Blueprint, request, jsonify, g
-from sqlalchemy import and_
+from sqlalchemy import and_, update
+from sqlalchemy.orm import selectinload, load_only
 from app import db
 from app.models import TimeEntry, Job, Technician, PayPeriod
 from app.utils.logging import get_logger, audit_logger, log_action
+from app.utils.dates import parse_iso_date, parse_hhmm
 from app.utils.auth import (
     jwt_required_with_user,
     manager_required,
@@ -20,24 +22,50 @@ from app.utils.auth import (
 time_entries_bp = Blueprint('time_entries', __name__)
 logger = get_logger(__name__)
 
+# calculate_hours() constants
+SECONDS_PER_DAY = 86400
+SECONDS_PER_HOUR = Decimal(3600)
+HOURS_QUANTUM = Decimal('0.01')
+
 
 def calculate_hours(time_in, time_out):
     """Calculate hours worked between two times."""
     if not time_in or not time_out:
         return None
 
-    # Create datetime objects for calculation
-    base_date = datetime.today().date()
-    dt_in = datetime.combine(base_date, time_in)
-    dt_out = datetime.combine(base_date, time_out)
+    # Work in whole seconds since midnight; exact Decimal division avoids
+    # the float -> str -> Decimal round trip
+    seconds_in = time_in.hour * 3600 + time_in.minute * 60 + time_in.second
+    seconds_out = time_out.hour * 3600 + time_out.minute * 60 + time_out.second
+    duration = seconds_out - seconds_in
 
     # Handle overnight shifts
-    if dt_out < dt_in:
-        dt_out += timedelta(days=1)
+    if duration < 0:
+        duration += SECONDS_PER_DAY
+
+    return (Decimal(duration) / SECONDS_PER_HOUR).quantize(HOURS_QUANTUM)
+
+
+def _time_entry_summary(entry):
+    """Serialize the summary fields of a time entry (no notes, job or technician)."""
+    return {
+        'entry_id': entry.entry_id,
+        'job_id': entry.job_id,
+        'tech_id': entry.tech_id,
+        'date_worked': entry.date_worked.isoformat() if entry.date_worked else None,
+        'hours_worked': float(entry.hours_worked) if entry.hours_worked else None,
+        'status': entry.status,
+    }
+
+
+def _job_exists(job_id):
+    """Check that a job exists without loading the row."""
+    return db.session.query(db.exists().where(Job.job_id == job_id)).scalar()
+
 
-    duration = dt_out - dt_in
-    hours = Decimal(str(duration.total_seconds() / 3600))
-    return round(hours, 2)
+def _technician_exists(tech_id):
+    """Check that a technician exists without loading the row."""
+    return db.session.query(db.exists().where(Technician.tech_id == tech_id)).scalar()
 
 
 @time_entries_bp.route('', methods=['GET'])
@@ -53,10 +81,14 @@ def list_time_entries():
         - status: Filter by entry status
         - period_id: Filter by pay period
         - from_date, to_date: Date range filter
+        - count: 'false' to skip the total count and return has_next instead
+        - fields: 'summary' to return only ids, date, hours and status
     """
     user = g.current_user
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 25, type=int)
+    with_count = request.args.get('count', 'true').lower() != 'false'
+    summary = request.args.get('fields', 'full').lower() == 'summary'
     tech_id = request.args.get('tech_id', type=int)
     job_id = request.args.get('job_id', type=int)
     status = request.args.get('status')
@@ -65,40 +97,79 @@ def list_time_entries():
     to_date = request.args.get('to_date')
     unassigned = request.args.get('unassigned', '').lower() == 'true'
 
-    query = TimeEntry.query
+    try:
+        from_date = parse_iso_date(from_date) if from_date else None
+        to_date = parse_iso_date(to_date) if to_date else None
+    except ValueError:
+        return jsonify({'error': 'Invalid date format (expected YYYY-MM-DD)'}), 400
+
+    # Collect the filters and apply them in a single WHERE clause
+    filters = []
 
     # Technicians can only see their own entries
     if user.role == 'technician':
         if not user.tech_id:
             return jsonify({'error': 'User not linked to technician'}), 400
-        query = query.filter(TimeEntry.tech_id == user.tech_id)
+        filters.append(TimeEntry.tech_id == user.tech_id)
     elif unassigned:
         # Filter for entries without a technician assigned
-        query = query.filter(TimeEntry.tech_id.is_(None))
+        filters.append(TimeEntry.tech_id.is_(None))
     elif tech_id:
-        query = query.filter(TimeEntry.tech_id == tech_id)
+        filters.append(TimeEntry.tech_id == tech_id)
 
     if job_id:
-        query = query.filter(TimeEntry.job_id == job_id)
+        filters.append(TimeEntry.job_id == job_id)
 
     if status:
-        query = query.filter(TimeEntry.status == status)
+        filters.append(TimeEntry.status == status)
 
     if period_id:
-        query = query.filter(TimeEntry.period_id == period_id)
+        filters.append(TimeEntry.period_id == period_id)
 
     if from_date:
-        query = query.filter(TimeEntry.date_worked >= from_date)
+        filters.append(TimeEntry.date_worked >= from_date)
 
     if to_date:
-        query = query.filter(TimeEntry.date_worked <= to_date)
+        filters.append(TimeEntry.date_worked <= to_date)
+
+    if summary:
+        # Load only the summary columns; skips notes and the job/technician loads
+        query = TimeEntry.query.options(load_only(
+            TimeEntry.entry_id,
+            TimeEntry.job_id,
+            TimeEntry.tech_id,
+            TimeEntry.date_worked,
+            TimeEntry.hours_worked,
+            TimeEntry.status
+        ))
+        serialize = _time_entry_summary
+    else:
+        # to_dict() reads the job and technician; load them in one batched
+        # query each instead of one per entry
+        query = TimeEntry.query.options(
+            selectinload(TimeEntry.job),
+            selectinload(TimeEntry.technician)
+        )
+        serialize = TimeEntry.to_dict
+
+    query = query.filter(*filters).order_by(TimeEntry.date_worked.desc(), TimeEntry.created_at.desc())
 
-    query = query.order_by(TimeEntry.date_worked.desc(), TimeEntry.created_at.desc())
+    if not with_count:
+        # Fetch one extra row to detect a next page instead of running COUNT(*)
+        page = max(page, 1)
+        per_page = max(per_page, 1)
+        items = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+
+        return jsonify({
+            'time_entries': [serialize(te) for te in items[:per_page]],
+            'has_next': len(items) > per_page,
+            'current_page': page
+        }), 200
 
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
     return jsonify({
-        'time_entries': [te.to_dict() for te in pagination.items],
+        'time_entries': [serialize(te) for te in pagination.items],
         'total': pagination.total,
         'pages': pagination.pages,
         'current_page': page
@@ -152,8 +223,17 @@ def create_time_entry():
     if not date_worked:
         return jsonify({'error': 'Date worked required'}), 400
 
+    # Parse date and times
+    try:
+        date_worked = parse_iso_date(date_worked)
+        time_in = parse_hhmm(data.get('time_in'))
+        time_out = parse_hhmm(data.get('time_out'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid date or time format (expected YYYY-MM-DD and HH:MM)'}), 400
+
     # Validate job
-    job = Job.query.get(job_id)
+    # Only the ticket number is needed (for the audit log)
+    job = db.session.query(Job.ticket_number).filter(Job.job_id == job_id).first()
     if not job:
         return jsonify({'error': 'Job not found'}), 404
 
@@ -167,18 +247,9 @@ def create_time_entry():
 
     # Validate technician if provided
     if tech_id:
-        technician = Technician.query.get(tech_id)
-        if not technician:
+        if not _technician_exists(tech_id):
             return jsonify({'error': 'Technician not found'}), 404
 
-    # Parse times
-    time_in = None
-    time_out = None
-    if data.get('time_in'):
-        time_in = datetime.strptime(data['time_in'], '%H:%M').time()
-    if data.get('time_out'):
-        time_out = datetime.strptime(data['time_out'], '%H:%M').time()
-
     # Calculate or use provided hours
     hours_worked = data.get('hours_worked')
     if time_in and time_out and not hours_worked:
@@ -214,21 +285,28 @@ def create_time_entry():
     )
 
     db.session.add(entry)
-    db.session.commit()
+    db.session.flush()
 
-    logger.info(f"Time entry created: {entry.entry_id} for job {job_id}")
+    # Serialize once for both the audit entry and the response
+    entry_data = entry.to_dict()
+
+    # The entry and its audit row commit together in one transaction
     audit_logger.log(
         action_type='time_entry_created',
         entity_type='time_entry',
         entity_id=entry.entry_id,
-        new_values=entry.to_dict(),
+        new_values=entry_data,
         description=f"Time entry created for job {job.ticket_number}",
-        user_id=user.user_id
+        user_id=user.user_id,
+        commit=False
     )
+    db.session.commit()
+
+    logger.info(f"Time entry created: {entry.entry_id} for job {job_id}")
 
     return jsonify({
         'message': 'Time entry created successfully',
-        'time_entry': entry.to_dict()
+        'time_entry': entry_data
     }), 201
 
 
@@ -253,14 +331,17 @@ def update_time_entry(entry_id):
     old_values = entry.to_dict()
 
     # Update allowed fields
-    if 'date_worked' in data:
-        entry.date_worked = data['date_worked']
+    try:
+        if 'date_worked' in data:
+            entry.date_worked = parse_iso_date(data['date_worked'])
 
-    if 'time_in' in data:
-        entry.time_in = datetime.strptime(data['time_in'], '%H:%M').time() if data['time_in'] else None
+        if 'time_in' in data:
+            entry.time_in = parse_hhmm(data['time_in'])
 
-    if 'time_out' in data:
-        entry.time_out = datetime.strptime(data['time_out'], '%H:%M').time() if data['time_out'] else None
+        if 'time_out' in data:
+            entry.time_out = parse_hhmm(data['time_out'])
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid date or time format (expected YYYY-MM-DD and HH:MM)'}), 400
 
     if 'hours_worked' in data:
         entry.hours_worked = data['hours_worked']
@@ -282,14 +363,12 @@ def update_time_entry(entry_id):
     # Managers can update job_id and tech_id
     if user.role in ('admin', 'manager'):
         if 'job_id' in data:
-            job = Job.query.get(data['job_id'])
-            if not job:
+            if not _job_exists(data['job_id']):
                 return jsonify({'error': 'Job not found'}), 404
             entry.job_id = data['job_id']
 
         if 'tech_id' in data:
-            tech = Technician.query.get(data['tech_id'])
-            if not tech:
+            if not _technician_exists(data['tech_id']):
                 return jsonify({'error': 'Technician not found'}), 404
             entry.tech_id = data['tech_id']
 
@@ -459,6 +538,38 @@ def reject_time_entry(entry_id):
     }), 200
 
 
+def _bulk_update_status(entry_ids, from_status, errors, **values):
+    """
+    Move entries from one status to another in a single UPDATE.
+
+    The status guard matches every entry only if none changed since it was
+    read. If any did, the UPDATE is rolled back and every entry is reported
+    as an error, so entries are never reported as done when they were not.
+
+    Args:
+        entry_ids: Validated entry IDs, in request order
+        from_status: Status the entries must still have
+        errors: Error list to append entries to when the UPDATE is rolled back
+        **values: Column values to set, including the new status
+
+    Returns:
+        list: IDs of the entries that were updated (empty if rolled back)
+    """
+    result = db.session.execute(
+        update(TimeEntry)
+        .where(TimeEntry.entry_id.in_(entry_ids), TimeEntry.status == from_status)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == len(entry_ids):
+        return entry_ids
+
+    db.session.rollback()
+    for entry_id in entry_ids:
+        errors.append({'entry_id': entry_id, 'error': 'Status changed concurrently, please retry'})
+    return []
+
+
 @time_entries_bp.route('/bulk-submit', methods=['POST'])
 @jwt_required_with_user
 def bulk_submit_entries():
@@ -480,8 +591,16 @@ def bulk_submit_entries():
     submitted = []
     errors = []
 
+    # Load and lock every requested entry in one query, validate in Python;
+    # the row locks keep the statuses checked below current until commit
+    entries = {
+        entry.entry_id: entry
+        for entry in TimeEntry.query.filter(TimeEntry.entry_id.in_(entry_ids)).with_for_update().all()
+    }
+    submitted_ids = set()
+
     for entry_id in entry_ids:
-        entry = TimeEntry.query.get(entry_id)
+        entry = entries.get(entry_id)
 
         if not entry:
             errors.append({'entry_id': entry_id, 'error': 'Not found'})
@@ -491,7 +610,8 @@ def bulk_submit_entries():
             errors.append({'entry_id': entry_id, 'error': 'Access denied'})
             continue
 
-        if entry.status != 'draft':
+        # A repeated ID has already been submitted by this request
+        if entry.status != 'draft' or entry_id in submitted_ids:
             errors.append({'entry_id': entry_id, 'error': 'Not in draft status'})
             continue
 
@@ -503,10 +623,14 @@ def bulk_submit_entries():
             errors.append({'entry_id': entry_id, 'error': 'Missing hours'})
             continue
 
-        entry.status = 'submitted'
-        entry.updated_by = user.user_id
+        submitted_ids.add(entry_id)
         submitted.append(entry_id)
 
+    # One UPDATE for all valid entries
+    if submitted:
+        submitted = _bulk_update_status(
+            submitted, 'draft', errors, status='submitted', updated_by=user.user_id
+        )
     db.session.commit()
 
     if submitted:
@@ -546,23 +670,38 @@ def bulk_verify_entries():
     verified = []
     errors = []
 
+    # Load and lock every requested entry in one query, validate in Python;
+    # the row locks keep the statuses checked below current until commit
+    entries = {
+        entry.entry_id: entry
+        for entry in TimeEntry.query.filter(TimeEntry.entry_id.in_(entry_ids)).with_for_update().all()
+    }
+    verified_ids = set()
+
     for entry_id in entry_ids:
-        entry = TimeEntry.query.get(entry_id)
+        entry = entries.get(entry_id)
 
         if not entry:
             errors.append({'entry_id': entry_id, 'error': 'Not found'})
             continue
 
-        if entry.status != 'submitted':
+        # A repeated ID has already been verified by this request
+        if entry.status != 'submitted' or entry_id in verified_ids:
             errors.append({'entry_id': entry_id, 'error': 'Not submitted'})
             continue
 
-        entry.status = 'verified'
-        entry.verified_by = user.user_id
-        entry.verified_at = datetime.utcnow()
-        entry.updated_by = user.user_id
+        verified_ids.add(entry_id)
         verified.append(entry_id)
 
+    # One UPDATE for all valid entries
+    if verified:
+        verified = _bulk_update_status(
+            verified, 'submitted', errors,
+            status='verified',
+            verified_by=user.user_id,
+            verified_at=datetime.utcnow(),
+            updated_by=user.user_id
+        )
     db.session.commit()
 
     if verified:
@@ -600,7 +739,11 @@ def list_time_entries_grouped():
     to_date = request.args.get('to_date')
     unassigned = request.args.get('unassigned', '').lower() == 'true'
 
-    query = TimeEntry.query
+    # Batch-load the job and technician used for grouping and to_dict()
+    query = TimeEntry.query.options(
+        selectinload(TimeEntry.job),
+        selectinload(TimeEntry.technician)
+    )
 
     # Technicians can only see their own entries
     if user.role == 'technician':
@@ -668,38 +811,35 @@ def get_my_summary():
     if not user.tech_id:
         return jsonify({'error': 'User not linked to technician'}), 400
 
-    from sqlalchemy import func
+    from sqlalchemy import case, func
 
-    # Get totals by status
+    today = datetime.utcnow().date()
+    week_start = today - timedelta(days=today.weekday())
+    in_week = TimeEntry.date_worked >= week_start
+
+    # Per-status totals plus conditional week aggregates in one round-trip;
+    # the week totals are the sum of the per-status week columns
     status_totals = db.session.query(
         TimeEntry.status,
         func.count(TimeEntry.entry_id),
-        func.sum(TimeEntry.hours_worked)
+        func.sum(TimeEntry.hours_worked),
+        func.sum(case((in_week, 1), else_=0)),
+        func.sum(case((in_week, TimeEntry.hours_worked), else_=0))
     ).filter(
         TimeEntry.tech_id == user.tech_id
     ).group_by(TimeEntry.status).all()
 
-    # Current week entries
-    today = datetime.utcnow().date()
-    week_start = today - timedelta(days=today.weekday())
-
-    week_entries = TimeEntry.query.filter(
-        TimeEntry.tech_id == user.tech_id,
-        TimeEntry.date_worked >= week_start
-    ).all()
-
-    week_hours = sum(
-        float(e.hours_worked) for e in week_entries if e.hours_worked
-    )
+    week_count = sum(int(row[3] or 0) for row in status_totals)
+    week_hours = sum(float(row[4] or 0) for row in status_totals)
 
     return jsonify({
         'by_status': {
             status: {'count': count, 'hours': float(hours) if hours else 0}
-            for status, count, hours in status_totals
+            for status, count, hours, _, _ in status_totals
         },
         'current_week': {
-            'entries': len(week_entries),
-            'hours': week_hours,
+            'entries': week_count,
+            'hours': float(week_hours),
             'week_start': week_start.isoformat()
         }
     }), 200
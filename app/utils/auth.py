@@ -2,13 +2,23 @@
 Authentication and authorization utilities.
 Provides role-based access control (RBAC) and JWT token handling.
 """
+import re
+import threading
+import time
+from collections import OrderedDict, deque
 from functools import wraps
-from flask import request, jsonify, g
+from flask import request, jsonify, g, current_app
 from flask_jwt_extended import (
     verify_jwt_in_request,
     get_jwt_identity,
     get_jwt,
 )
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from werkzeug.local import LocalProxy
+from app import db
+from app.models import User
+from app.utils.cache import cache_get, cache_set, cache_delete
 from app.utils.logging import get_logger, audit_logger
 
 logger = get_logger(__name__)
@@ -20,6 +30,126 @@ ROLE_HIERARCHY = {
     'technician': 1,
 }
 
+# Compiled once at import rather than per password check
+_DIGIT_RE = re.compile(r'\d')
+
+# Permission matrix for check_permission(); admins are allowed everything
+PERMISSIONS = {
+    'manager': {
+        'job': frozenset({'view', 'create', 'update', 'delete'}),
+        'time_entry': frozenset({'view', 'create', 'update', 'delete', 'verify'}),
+        'technician': frozenset({'view'}),
+        'report': frozenset({'view', 'generate'}),
+        'pay_period': frozenset({'view', 'close'}),
+        'invoice': frozenset({'view', 'create', 'update'}),
+    },
+    'technician': {
+        'job': frozenset({'view'}),
+        'time_entry': frozenset({'view', 'create', 'update'}),
+        'technician': frozenset({'view_own'}),
+        'report': frozenset({'view_own'}),
+    },
+}
+_NO_PERMISSIONS = frozenset()
+
+# Cached role/status per user for the auth decorators
+AUTH_USER_CACHE_KEY = 'auth_user:{user_id}'
+
+
+def _load_user_cached(user_id):
+    """
+    Load a user once per request.
+
+    Args:
+        user_id: ID of the user to load
+
+    Returns:
+        User: The user, or None if not found
+    """
+    current_request = request._get_current_object()
+    cached = g.get('_current_user')
+    if (cached is not None and cached.user_id == user_id
+            and g.get('_current_user_request') is current_request):
+        return cached
+
+    user = db.session.get(User, user_id)
+    g._current_user = user
+    g._current_user_request = current_request
+    return user
+
+
+def _load_auth_user(user_id):
+    """
+    Get the role and status used to authorize a user, from cache if possible.
+
+    On a cache miss the user row is loaded through _load_user_cached() so a
+    route that reads g.current_user does not query it again. The cache is
+    only used with AUTH_USER_CACHE on, and a cache error falls back to the
+    database.
+
+    Args:
+        user_id: ID of the authenticated user
+
+    Returns:
+        dict: {'role': ..., 'status': ...}, or None if the user does not exist
+    """
+    use_cache = current_app.config.get('AUTH_USER_CACHE', False)
+    cache_key = AUTH_USER_CACHE_KEY.format(user_id=user_id)
+    if use_cache:
+        auth_user = cache_get(cache_key)
+        if auth_user is not None:
+            return auth_user
+
+    user = _load_user_cached(user_id)
+    if not user:
+        return None
+    auth_user = {'role': user.role, 'status': user.status}
+    if use_cache:
+        cache_set(cache_key, auth_user, timeout=current_app.config.get('AUTH_USER_CACHE_TIMEOUT', 60))
+    return auth_user
+
+
+def _get_current_user_obj():
+    """Load the authenticated User row on first use within the request."""
+    return _load_user_cached(g.user_id)
+
+
+# g.current_user only queries the user when a route actually reads it
+_current_user_proxy = LocalProxy(_get_current_user_obj)
+
+
+def invalidate_auth_user(user_id):
+    """
+    Drop the cached role/status for a user.
+
+    Call after committing a change to a user's role or status.
+
+    Args:
+        user_id: ID of the user that changed
+    """
+    cache_delete(AUTH_USER_CACHE_KEY.format(user_id=user_id))
+
+
+def _verify_jwt_once():
+    """Verify the request's JWT, skipping the check if already done this request."""
+    # g belongs to the app context, which can outlive a request (test
+    # clients, CLI scripts), so remember which request was verified
+    current_request = request._get_current_object()
+    if g.get('_jwt_verified_request') is not current_request:
+        verify_jwt_in_request()
+        g._jwt_verified_request = current_request
+
+
+# Token and identity failures that mean "not authenticated"; anything else
+# (database errors, bugs in the route) propagates to Flask's error handlers
+AUTH_ERRORS = (JWTExtendedException, PyJWTError, ValueError, TypeError)
+
+
+def _verified_user_id():
+    """Verify the request's JWT and return its identity as a user ID."""
+    _verify_jwt_once()
+    return int(get_jwt_identity())
+
 
 def get_current_user():
     """
@@ -28,14 +158,11 @@ def get_current_user():
     Returns:
         User: Current user object or None
     """
-    from app.models import User
-
     try:
-        verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        return User.query.get(int(user_id))
-    except Exception:
+        user_id = _verified_user_id()
+    except AUTH_ERRORS:
         return None
+    return _load_user_cached(user_id)
 
 
 def jwt_required_with_user(fn):
@@ -45,28 +172,26 @@ def jwt_required_with_user(fn):
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        from app.models import User
-
         try:
-            verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            user = User.query.get(int(user_id))
+            user_id = _verified_user_id()
+        except AUTH_ERRORS as e:
+            logger.warning(f"Authentication error: {e}")
+            return jsonify({'error': 'Authentication required'}), 401
 
-            if not user:
-                logger.warning(f"JWT valid but user {user_id} not found")
-                return jsonify({'error': 'User not found'}), 404
+        auth_user = _load_auth_user(user_id)
 
-            if user.status != 'active':
-                logger.warning(f"Inactive user {user_id} attempted access")
-                return jsonify({'error': 'Account is not active'}), 403
+        if not auth_user:
+            logger.warning(f"JWT valid but user {user_id} not found")
+            return jsonify({'error': 'User not found'}), 404
 
-            g.current_user = user
-            g.user_id = user.user_id
+        if auth_user['status'] != 'active':
+            logger.warning(f"Inactive user {user_id} attempted access")
+            return jsonify({'error': 'Account is not active'}), 403
 
-            return fn(*args, **kwargs)
-        except Exception as e:
-            logger.error(f"Authentication error: {str(e)}")
-            return jsonify({'error': 'Authentication required'}), 401
+        g.current_user = _current_user_proxy
+        g.user_id = user_id
+
+        return fn(*args, **kwargs)
 
     return wrapper
 
@@ -83,57 +208,53 @@ def role_required(*allowed_roles):
         def admin_only_route():
             ...
     """
+    allowed = frozenset(allowed_roles)
+
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            from app.models import User
-
             try:
-                verify_jwt_in_request()
-                user_id = get_jwt_identity()
-                user = User.query.get(int(user_id))
-
-                if not user:
-                    return jsonify({'error': 'User not found'}), 404
-
-                if user.status != 'active':
-                    return jsonify({'error': 'Account is not active'}), 403
-
-                if user.role not in allowed_roles:
-                    logger.warning(
-                        f"User {user_id} with role {user.role} "
-                        f"attempted to access route requiring {allowed_roles}"
-                    )
-                    audit_logger.log(
-                        action_type='access_denied',
-                        description=f"User role {user.role} not in {allowed_roles}",
-                        user_id=user_id
-                    )
-                    return jsonify({
-                        'error': 'Insufficient permissions',
-                        'required_roles': list(allowed_roles)
-                    }), 403
-
-                g.current_user = user
-                g.user_id = user.user_id
-
-                return fn(*args, **kwargs)
-            except Exception as e:
-                logger.error(f"Authorization error: {str(e)}")
+                user_id = _verified_user_id()
+            except AUTH_ERRORS as e:
+                logger.warning(f"Authorization error: {e}")
                 return jsonify({'error': 'Authentication required'}), 401
 
-        return wrapper
-    return decorator
+            auth_user = _load_auth_user(user_id)
+
+            if not auth_user:
+                return jsonify({'error': 'User not found'}), 404
+
+            if auth_user['status'] != 'active':
+                return jsonify({'error': 'Account is not active'}), 403
+
+            role = auth_user['role']
+            if role not in allowed:
+                logger.warning(
+                    f"User {user_id} with role {role} "
+                    f"attempted to access route requiring {allowed_roles}"
+                )
+                audit_logger.log(
+                    action_type='access_denied',
+                    description=f"User role {role} not in {allowed_roles}",
+                    user_id=user_id
+                )
+                return jsonify({
+                    'error': 'Insufficient permissions',
+                    'required_roles': list(allowed_roles)
+                }), 403
+
+            g.current_user = _current_user_proxy
+            g.user_id = user_id
 
+            return fn(*args, **kwargs)
 
-def admin_required(fn):
-    """Shortcut decorator for admin-only routes."""
-    return role_required('admin')(fn)
+        return wrapper
+    return decorator
 
 
-def manager_required(fn):
-    """Shortcut decorator for manager and admin routes."""
-    return role_required('admin', 'manager')(fn)
+# Shortcut decorators, built once rather than per decorated route
+admin_required = role_required('admin')
+manager_required = role_required('admin', 'manager')
 
 
 def check_permission(user, action, resource, resource_owner_id=None):
@@ -156,26 +277,7 @@ def check_permission(user, action, resource, resource_owner_id=None):
     if user.role == 'admin':
         return True
 
-    # Define permission matrix
-    permissions = {
-        'manager': {
-            'job': ['view', 'create', 'update', 'delete'],
-            'time_entry': ['view', 'create', 'update', 'delete', 'verify'],
-            'technician': ['view'],
-            'report': ['view', 'generate'],
-            'pay_period': ['view', 'close'],
-            'invoice': ['view', 'create', 'update'],
-        },
-        'technician': {
-            'job': ['view'],
-            'time_entry': ['view', 'create', 'update'],
-            'technician': ['view_own'],
-            'report': ['view_own'],
-        },
-    }
-
-    role_permissions = permissions.get(user.role, {})
-    resource_permissions = role_permissions.get(resource, [])
+    resource_permissions = PERMISSIONS.get(user.role, {}).get(resource, _NO_PERMISSIONS)
 
     # Check for ownership-based permissions
     if f'{action}_own' in resource_permissions:
@@ -265,10 +367,16 @@ class RateLimiter:
     """
     Simple in-memory rate limiter for authentication endpoints.
     For production, use Redis-based rate limiting.
+
+    At most max_keys identifiers are tracked; when full, the least recently
+    recorded identifier is evicted so memory stays bounded under key churn.
     """
 
-    def __init__(self):
-        self._attempts = {}
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._attempts = OrderedDict()
+        # Gunicorn gthread workers share this instance across request threads
+        self._lock = threading.Lock()
 
     def is_rate_limited(self, key, max_attempts=5, window_seconds=300):
         """
@@ -282,32 +390,37 @@ class RateLimiter:
         Returns:
             bool: True if rate limited
         """
-        import time
-
-        current_time = time.time()
-        if key not in self._attempts:
-            self._attempts[key] = []
-
-        # Clean old attempts
-        self._attempts[key] = [
-            t for t in self._attempts[key]
-            if current_time - t < window_seconds
-        ]
-
-        return len(self._attempts[key]) >= max_attempts
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if not attempts:
+                return False
+
+            # Attempts are in time order: drop expired ones from the front,
+            # then drop the key once none are left
+            cutoff = time.monotonic() - window_seconds
+            while attempts and attempts[0] <= cutoff:
+                attempts.popleft()
+            if not attempts:
+                del self._attempts[key]
+                return False
+
+            return len(attempts) >= max_attempts
 
     def record_attempt(self, key):
         """Record an attempt for rate limiting."""
-        import time
-
-        if key not in self._attempts:
-            self._attempts[key] = []
-        self._attempts[key].append(time.time())
+        with self._lock:
+            if key in self._attempts:
+                self._attempts.move_to_end(key)
+            else:
+                self._attempts[key] = deque()
+                while len(self._attempts) > self.max_keys:
+                    self._attempts.popitem(last=False)
+            self._attempts[key].append(time.monotonic())
 
     def reset(self, key):
         """Reset attempts for a key (e.g., after successful login)."""
-        if key in self._attempts:
-            del self._attempts[key]
+        with self._lock:
+            self._attempts.pop(key, None)
 
 
 # Global rate limiter instance
@@ -327,13 +440,16 @@ def validate_password_strength(password):
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
 
-    if not any(c.isupper() for c in password):
+    # Case mapping runs in C and, unlike an [A-Z] class, still accepts
+    # non-ASCII letters: lowering changes the string only if it has an
+    # uppercase character, and vice versa
+    if password.lower() == password:
         return False, "Password must contain at least one uppercase letter"
 
-    if not any(c.islower() for c in password):
+    if password.upper() == password:
         return False, "Password must contain at least one lowercase letter"
 
-    if not any(c.isdigit() for c in password):
+    if not _DIGIT_RE.search(password):
         return False, "Password must contain at least one number"
 
     return True, None
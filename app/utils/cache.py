@@ -0,0 +1,57 @@
+"""
+Cache helpers that fall back to the database when the cache is unavailable.
+
+Flask-Caching passes backend errors straight through (RedisCache raises
+redis.exceptions.ConnectionError when Redis is down). Cached values here
+are always derived from the database, so a cache failure is treated as a
+miss instead of failing the request.
+"""
+from app import cache
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def cache_get(key):
+    """
+    Get a value from the cache.
+
+    Args:
+        key: Cache key
+
+    Returns:
+        The cached value, or None on a miss or cache error
+    """
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"Cache get failed for {key}: {e}")
+        return None
+
+
+def cache_set(key, value, timeout=None):
+    """
+    Store a value in the cache, ignoring cache errors.
+
+    Args:
+        key: Cache key
+        value: Value to store
+        timeout: Timeout in seconds (optional, defaults to CACHE_DEFAULT_TIMEOUT)
+    """
+    try:
+        cache.set(key, value, timeout=timeout)
+    except Exception as e:
+        logger.warning(f"Cache set failed for {key}: {e}")
+
+
+def cache_delete(*keys):
+    """
+    Delete keys from the cache, ignoring cache errors.
+
+    Args:
+        *keys: Cache keys to delete
+    """
+    try:
+        cache.delete_many(*keys)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {', '.join(keys)}: {e}")
@@ -0,0 +1,54 @@
+"""
+Date parsing helpers.
+"""
+from datetime import date, time
+
+
+def parse_iso_date(value):
+    """
+    Parse a YYYY-MM-DD string into a date.
+
+    Uses date.fromisoformat(), which is implemented in C and much faster
+    than datetime.strptime().
+
+    Args:
+        value: ISO 8601 date string
+
+    Returns:
+        date: Parsed date
+
+    Raises:
+        ValueError: If the string is not a valid ISO date
+    """
+    return date.fromisoformat(value)
+
+
+def parse_hhmm(value):
+    """
+    Parse an HH:MM string into a time.
+
+    A direct split is much cheaper than datetime.strptime(value, '%H:%M')
+    and accepts the same input, including single-digit hours or minutes.
+
+    Args:
+        value: Time string such as "08:30", or None/empty
+
+    Returns:
+        time: Parsed time, or None if value is empty
+
+    Raises:
+        ValueError: If the value is not a valid HH:MM time string
+    """
+    if not value:
+        return None
+
+    # JSON bodies can carry numbers or other types here
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid time {value!r}, expected HH:MM")
+
+    hours, sep, minutes = value.partition(':')
+    if (not sep or not 1 <= len(hours) <= 2 or not 1 <= len(minutes) <= 2
+            or not hours.isdigit() or not minutes.isdigit()):
+        raise ValueError(f"Invalid time '{value}', expected HH:MM")
+
+    return time(int(hours), int(minutes))
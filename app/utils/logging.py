@@ -3,31 +3,94 @@ Comprehensive logging configuration for the Work Tracking System.
 Provides structured logging with file and console handlers,
 request logging, and audit trail integration.
 """
+import atexit
+import copy
 import logging
 import os
-import json
+import queue
+import threading
+import time
+import weakref
+import orjson
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from functools import wraps
 from flask import request, g, has_request_context
+from sqlalchemy import insert
+
+
+def _capture_request_context(record):
+    """
+    Attach the current request's context to a log record.
+
+    Captured once per record, in the thread that logged it, so records
+    formatted later on a listener thread keep their request details.
+
+    Args:
+        record: Log record
+
+    Returns:
+        dict: Request fields, or None outside a request
+    """
+    if hasattr(record, 'request_context'):
+        return record.request_context
+
+    context = None
+    if has_request_context():
+        context = {
+            'request_id': getattr(g, 'request_id', None),
+            'user_id': getattr(g, 'user_id', None),
+            'remote_addr': request.remote_addr,
+            'method': request.method,
+            'url': request.url,
+        }
+    record.request_context = context
+    return context
+
+
+class RequestContextFilter(logging.Filter):
+    """Filter that captures request context before a record is queued."""
+
+    def filter(self, record):
+        _capture_request_context(record)
+        return True
 
 
 class RequestFormatter(logging.Formatter):
-    """Custom formatter that includes request context information."""
+    """
+    Custom formatter that includes request context information.
+
+    The format string is fixed once constructed, so whether it uses
+    %(asctime)s is worked out once, and the strftime part of the timestamp
+    is reused for every record logged within the same second.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._uses_time = super().usesTime()
+        self._time_cache = (None, None)
+
+    def usesTime(self):
+        return self._uses_time
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+
+        second = int(record.created)
+        cached_second, cached_time = self._time_cache
+        if second != cached_second:
+            cached_time = time.strftime(self.default_time_format, self.converter(record.created))
+            self._time_cache = (second, cached_time)
+        return self.default_msec_format % (cached_time, record.msecs)
 
     def format(self, record):
-        if has_request_context():
-            record.url = request.url
-            record.remote_addr = request.remote_addr
-            record.method = request.method
-            record.request_id = getattr(g, 'request_id', '-')
-            record.user_id = getattr(g, 'user_id', '-')
-        else:
-            record.url = '-'
-            record.remote_addr = '-'
-            record.method = '-'
-            record.request_id = '-'
-            record.user_id = '-'
+        context = _capture_request_context(record) or {}
+        record.url = context.get('url') or '-'
+        record.remote_addr = context.get('remote_addr') or '-'
+        record.method = context.get('method') or '-'
+        record.request_id = context.get('request_id') or '-'
+        record.user_id = context.get('user_id') or '-'
 
         return super().format(record)
 
@@ -36,8 +99,14 @@ class JSONFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
 
     def format(self, record):
+        return self.format_bytes(record).decode('utf-8')
+
+    def format_bytes(self, record):
+        """Format a record as UTF-8 JSON bytes, for handlers that write bytes."""
         log_data = {
-            'timestamp': datetime.utcnow().isoformat(),
+            # The record's own creation time (no extra clock read); orjson
+            # renders datetimes natively in the same ISO 8601 as isoformat()
+            'timestamp': datetime.utcfromtimestamp(record.created),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
@@ -46,19 +115,209 @@ class JSONFormatter(logging.Formatter):
             'line': record.lineno,
         }
 
-        if has_request_context():
+        context = _capture_request_context(record)
+        if context:
             log_data.update({
-                'request_id': getattr(g, 'request_id', None),
-                'user_id': getattr(g, 'user_id', None),
-                'ip': request.remote_addr,
-                'method': request.method,
-                'url': request.url,
+                'request_id': context['request_id'],
+                'user_id': context['user_id'],
+                'ip': context['remote_addr'],
+                'method': context['method'],
+                'url': context['url'],
             })
 
         if record.exc_info:
             log_data['exception'] = self.formatException(record.exc_info)
 
-        return json.dumps(log_data)
+        return orjson.dumps(log_data, default=str)
+
+
+class SizeAccountingRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that keeps a running count of bytes written.
+
+    The stdlib handler formats every record twice (once to size it, once to
+    write it) and seeks to the end of the file on each emit. This one formats
+    once and only reads the file size when the file is (re)opened. Writes by
+    other processes to the same file are not counted.
+
+    The file is opened in binary mode. Formatters with a format_bytes()
+    method (JSONFormatter) are written without a str round-trip; other
+    output is encoded as UTF-8.
+
+    With maxBytes=0 nothing is rotated in-process. Rotation is left to
+    logrotate instead, and the file is reopened once it has been moved
+    away, the same check WatchedFileHandler does.
+    """
+
+    terminator = b'\n'
+    buffer_size = -1  # Default buffering
+    watch_on_emit = True  # Check for external rotation on every emit
+
+    def _open(self):
+        stream = open(self.baseFilename, 'ab', buffering=self.buffer_size)
+        st = os.fstat(stream.fileno())
+        self.bytes_written = st.st_size
+        self._file_id = (st.st_dev, st.st_ino)
+        return stream
+
+    def reopen_if_moved(self):
+        """Reopen the log file if it was renamed or deleted since it was opened."""
+        if self.stream is None:
+            return
+        try:
+            st = os.stat(self.baseFilename)
+            moved = (st.st_dev, st.st_ino) != self._file_id
+        except FileNotFoundError:
+            moved = True
+        if moved:
+            # Buffered records still belong to the rotated file
+            self.stream.flush()
+            self.stream.close()
+            self.stream = self._open()
+
+    def emit(self, record):
+        try:
+            format_bytes = getattr(self.formatter, 'format_bytes', None)
+            if format_bytes is not None:
+                data = format_bytes(record) + self.terminator
+            else:
+                data = self.format(record).encode('utf-8') + self.terminator
+
+            if self.stream is None:
+                self.stream = self._open()
+            elif not self.maxBytes and self.watch_on_emit:
+                self.reopen_if_moved()
+
+            if 0 < self.maxBytes <= self.bytes_written + len(data) and self.bytes_written:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+
+            self.stream.write(data)
+            if self.should_flush(record):
+                self.flush()
+            self.bytes_written += len(data)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def should_flush(self, record):
+        """Whether to flush the stream right after writing a record."""
+        return True
+
+
+# Buffered handlers still alive, flushed before a fork so buffered records
+# are not duplicated into the child
+_buffered_handlers = weakref.WeakSet()
+
+
+def _flush_buffered_handlers():
+    for handler in list(_buffered_handlers):
+        handler.flush()
+
+
+os.register_at_fork(before=_flush_buffered_handlers)
+
+
+class BufferedRotatingFileHandler(SizeAccountingRotatingFileHandler):
+    """
+    Size-accounting rotating handler that coalesces writes.
+
+    Records go into a buffer_size write buffer that a background thread
+    flushes every flush_interval seconds, so many small records reach the
+    disk in one write() call. ERROR and above are flushed immediately.
+
+    With maxBytes=0 the check for external rotation also runs on the flusher
+    thread, once per flush_interval rather than on every emit.
+    """
+
+    watch_on_emit = False
+
+    def __init__(self, *args, buffer_size=65536, flush_interval=0.5, **kwargs):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._flusher_pid = None
+        self._stopped = threading.Event()
+        super().__init__(*args, **kwargs)
+        _buffered_handlers.add(self)
+
+    def should_flush(self, record):
+        # Started lazily, and again after a fork (threads do not survive it)
+        if self._flusher_pid != os.getpid():
+            self._flusher_pid = os.getpid()
+            threading.Thread(target=self._run, name='log-flusher', daemon=True).start()
+        return record.levelno >= logging.ERROR
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            if self.maxBytes:
+                self.flush()
+                continue
+            self.acquire()
+            try:
+                self.reopen_if_moved()
+            finally:
+                self.release()
+            self.flush()
+
+    def close(self):
+        self._stopped.set()
+        super().close()
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    Handler that queues records for a QueueListener thread owning the real
+    handlers, so console and file I/O happen off the request thread.
+
+    The listener is started lazily and restarted after a fork, since
+    gunicorn's preload_app configures logging before forking workers and
+    threads do not survive the fork.
+    """
+
+    def __init__(self, *handlers):
+        super().__init__(queue.Queue(-1))
+        self.target_handlers = handlers
+        self._listener = None
+        self._pid = None
+        self.addFilter(RequestContextFilter())
+
+    def prepare(self, record):
+        # Resolve the message now, while its arguments are still current;
+        # the traceback is formatted later by the target handlers
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        # emit() runs under the handler lock, so the start check is serialized
+        if self._pid != os.getpid():
+            self._start()
+        self.queue.put_nowait(record)
+
+    def _start(self):
+        self.queue = queue.Queue(-1)
+        self._listener = QueueListener(
+            self.queue, *self.target_handlers, respect_handler_level=True
+        )
+        self._listener.start()
+        self._pid = os.getpid()
+
+    def close(self):
+        """Write any queued records, stop the listener and close the handlers."""
+        self.acquire()
+        try:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+            self._listener = None
+            self._pid = None
+        finally:
+            self.release()
+        for handler in self.target_handlers:
+            handler.close()
+        super().close()
 
 
 def setup_logging(app):
@@ -72,6 +331,7 @@ def setup_logging(app):
     log_file = app.config.get('LOG_FILE', 'logs/app.log')
     max_bytes = app.config.get('LOG_MAX_BYTES', 10485760)
     backup_count = app.config.get('LOG_BACKUP_COUNT', 5)
+    flush_interval = app.config.get('LOG_FLUSH_INTERVAL', 0)
 
     # Ensure log directory exists
     log_dir = os.path.dirname(log_file)
@@ -88,11 +348,19 @@ def setup_logging(app):
     console_handler.setFormatter(console_format)
 
     # File handler with rotation
-    file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=max_bytes,
-        backupCount=backup_count
-    )
+    if flush_interval > 0:
+        file_handler = BufferedRotatingFileHandler(
+            log_file,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            flush_interval=flush_interval
+        )
+    else:
+        file_handler = SizeAccountingRotatingFileHandler(
+            log_file,
+            maxBytes=max_bytes,
+            backupCount=backup_count
+        )
     file_handler.setLevel(log_level)
     file_handler.setFormatter(JSONFormatter())
 
@@ -103,26 +371,38 @@ def setup_logging(app):
     # Remove existing handlers
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
-
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
+        if isinstance(handler, (AsyncQueueHandler, SizeAccountingRotatingFileHandler)):
+            handler.close()
+
+    if app.config.get('LOG_ASYNC', False):
+        # Request threads only enqueue; a listener thread does the writes
+        queue_handler = AsyncQueueHandler(console_handler, file_handler)
+        root_logger.addHandler(queue_handler)
+        atexit.register(queue_handler.close)
+    else:
+        root_logger.addHandler(console_handler)
+        root_logger.addHandler(file_handler)
 
     # Reduce noise from third-party libraries
     logging.getLogger('werkzeug').setLevel(logging.WARNING)
     logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
 
-    # Request logging
+    # Request logging; the "started" line is opt-in, and both lines skip
+    # building their message when the level is disabled
+    log_request_start = app.config.get('LOG_REQUEST_START', False)
+
     @app.before_request
     def before_request():
-        import uuid
-        g.request_id = str(uuid.uuid4())[:8]
-        g.request_start_time = datetime.utcnow()
-        app.logger.debug(f"Request started: {request.method} {request.path}")
+        # 8 hex chars, same shape as the old uuid4 prefix but far cheaper
+        g.request_id = os.urandom(4).hex()
+        g.request_start_ns = time.perf_counter_ns()
+        if log_request_start and app.logger.isEnabledFor(logging.DEBUG):
+            app.logger.debug(f"Request started: {request.method} {request.path}")
 
     @app.after_request
     def after_request(response):
-        if hasattr(g, 'request_start_time'):
-            duration = (datetime.utcnow() - g.request_start_time).total_seconds() * 1000
+        if hasattr(g, 'request_start_ns') and app.logger.isEnabledFor(logging.INFO):
+            duration = (time.perf_counter_ns() - g.request_start_ns) / 1e6
             app.logger.info(
                 f"Request completed: {request.method} {request.path} "
                 f"-> {response.status_code} ({duration:.2f}ms)"
@@ -183,14 +463,55 @@ class AuditLogger:
     """
     Audit logger for recording system actions to the database.
     Integrates with the audit_logs table.
+
+    With AUDIT_ASYNC enabled, entries are queued and written in batches by a
+    background thread so the request does not wait on the audit insert.
+    Entries still queued when the process is killed may be lost; a normal
+    shutdown flushes the queue.
     """
 
     def __init__(self, app=None):
         self.app = app
         self.logger = get_logger('audit')
+        self.async_enabled = False
+        self.batch_size = 100
+        self.flush_interval = 0.1
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._db = None
+        self._model = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configure the audit logger for an application.
+
+        Args:
+            app: Flask application instance
+        """
+        self.app = app
+        self.async_enabled = app.config.get('AUDIT_ASYNC', False)
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', 100)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', 0.1)
+        self.queue_size = app.config.get('AUDIT_QUEUE_SIZE', 10000)
+
+        # Bound once here rather than imported per write; app/__init__ imports
+        # this module before db and the models exist
+        from app import db
+        from app.models import AuditLog
+        self._db = db
+        self._model = AuditLog
+
+        if self.async_enabled:
+            atexit.register(self.flush)
 
     def log(self, action_type, entity_type=None, entity_id=None,
-            old_values=None, new_values=None, description=None, user_id=None):
+            old_values=None, new_values=None, description=None, user_id=None,
+            commit=True):
         """
         Log an action to the audit trail.
 
@@ -202,10 +523,10 @@ class AuditLogger:
             new_values: New values
             description: Human-readable description
             user_id: ID of user performing action
+            commit: Commit the entry on its own (queued when AUDIT_ASYNC is
+                on). Pass False to add it to the caller's open transaction
+                instead, so it is written only if the caller commits.
         """
-        from app.models import AuditLog
-        from app import db
-
         if user_id is None and has_request_context():
             user_id = getattr(g, 'user_id', None)
 
@@ -216,26 +537,127 @@ class AuditLogger:
             ip_address = request.remote_addr
             user_agent = request.headers.get('User-Agent')
 
-        audit_entry = AuditLog(
-            user_id=user_id,
-            action_type=action_type,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            old_values=old_values,
-            new_values=new_values,
-            description=description,
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
+        entry = {
+            'user_id': user_id,
+            'action_type': action_type,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'old_values': old_values,
+            'new_values': new_values,
+            'description': description,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'created_at': datetime.utcnow(),
+        }
+
+        if not commit:
+            # Rides the caller's transaction; queuing it would write the
+            # entry even if that transaction is rolled back
+            self._write_entry(entry, commit=False)
+            return
+
+        if self.async_enabled:
+            try:
+                self._get_queue().put_nowait(entry)
+                return
+            except queue.Full:
+                # Writer is falling behind; apply back-pressure by writing inline
+                self.logger.warning("Audit queue full, writing entry synchronously")
+
+        self._write_entry(entry)
+
+    def flush(self):
+        """Write any queued audit entries from the calling thread."""
+        if self._queue is None or self._pid != os.getpid():
+            return
+
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch)
+                batch = []
+
+        if batch:
+            self._write_batch(batch)
+
+    def _write_entry(self, entry, commit=True):
+        """Write a single entry using the current (request) session."""
+        db = self._db
+
+        if not commit:
+            # Rides the caller's transaction; the caller commits
+            db.session.add(self._model(**entry))
+            return
 
         try:
-            db.session.add(audit_entry)
+            db.session.add(self._model(**entry))
             db.session.commit()
-            self.logger.info(f"Audit: {action_type} {entity_type}:{entity_id} by user {user_id}")
+            self.logger.info(
+                f"Audit: {entry['action_type']} {entry['entity_type']}:{entry['entity_id']} "
+                f"by user {entry['user_id']}"
+            )
         except Exception as e:
             db.session.rollback()
             self.logger.error(f"Failed to write audit log: {e}")
 
+    def _write_batch(self, batch):
+        """Insert a batch of entries in one statement from a fresh app context."""
+        db = self._db
+
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(self._model), batch)
+                db.session.commit()
+                self.logger.info(f"Audit: wrote {len(batch)} entries")
+            except Exception as e:
+                db.session.rollback()
+                self.logger.error(f"Failed to write {len(batch)} audit log entries: {e}")
+
+    def _get_queue(self):
+        """
+        Return the entry queue, starting the writer thread if needed.
+
+        The thread is started lazily and restarted after a fork, since
+        gunicorn's preload_app creates the app before forking workers and
+        threads do not survive the fork.
+        """
+        pid = os.getpid()
+        if self._pid == pid and self._thread.is_alive():
+            return self._queue
+
+        with self._lock:
+            if self._pid != pid or not self._thread.is_alive():
+                if self._pid != pid:
+                    self._queue = queue.Queue(maxsize=self.queue_size)
+                    self._pid = pid
+                self._thread = threading.Thread(
+                    target=self._run, name='audit-writer', daemon=True
+                )
+                self._thread.start()
+
+        return self._queue
+
+    def _run(self):
+        """Drain the queue, writing up to batch_size entries per flush_interval."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            self._write_batch(batch)
+
 
 # Global audit logger instance
 audit_logger = AuditLogger()
@@ -21,14 +21,114 @@ Four Payouts per Tech per Job:
 3. Per Diem
 4. Personal Expenses
 """
+from bisect import bisect_right
 from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import func, literal, or_, select, type_coerce
+from sqlalchemy.orm import selectinload
+from app import db
 from app.models import Job, TimeEntry, Technician, MileageRateHistory
+from app.utils.cache import cache_get, cache_set
 
+# Used when no rate covers a date (matches MileageRateHistory.get_rate_for_date)
+DEFAULT_MILEAGE_RATE = Decimal('0.67')
 
-def calculate_job_pay(job_id):
+# The rate history is tiny and only changes when an admin adds a rate.
+# Keyed by its version so every worker sees a new rate straight away.
+MILEAGE_RATES_CACHE_KEY = 'mileage_rates:{version}'
+MILEAGE_RATES_CACHE_TIMEOUT = 3600
+
+
+def _mileage_rates_version():
+    """
+    Read the mileage rate history version from the database.
+
+    Rates are only ever added (the previous open rate is closed in the same
+    commit), so the row count and newest rate_id change with every change.
+    """
+    row = db.session.query(
+        func.count(MileageRateHistory.rate_id),
+        func.max(MileageRateHistory.rate_id)
+    ).one()
+    return f'{row[0]}:{row[1]}'
+
+
+def _load_mileage_rates():
+    """
+    Load the full mileage rate history, ordered by effective date.
+
+    The table holds one row per rate change, so loading it whole and
+    searching in memory is cheaper than a query per time entry. The result
+    is cached per version of the history, which is always read from the
+    database, so a rate added through another worker is never missed.
+
+    Returns:
+        tuple: (effective_dates, rows) where rows are
+            (effective_date, end_date, rate_per_mile) tuples
+    """
+    cache_key = MILEAGE_RATES_CACHE_KEY.format(version=_mileage_rates_version())
+    rates = cache_get(cache_key)
+    if rates is None:
+        rows = db.session.query(
+            MileageRateHistory.effective_date,
+            MileageRateHistory.end_date,
+            MileageRateHistory.rate_per_mile
+        ).order_by(MileageRateHistory.effective_date).all()
+        rates = ([row[0] for row in rows], [tuple(row) for row in rows])
+        cache_set(cache_key, rates, timeout=MILEAGE_RATES_CACHE_TIMEOUT)
+    return rates
+
+
+def _rate_for_date(rates, date):
+    """
+    Find the mileage rate in effect on a date from preloaded history.
+
+    Same result as MileageRateHistory.get_rate_for_date: the latest rate
+    that started on or before the date and had not ended by then.
+
+    Args:
+        rates: History as returned by _load_mileage_rates()
+        date: Date worked
+
+    Returns:
+        Decimal: Rate per mile
+    """
+    effective_dates, rows = rates
+    i = bisect_right(effective_dates, date)
+    while i:
+        i -= 1
+        end_date = rows[i][1]
+        if end_date is None or end_date >= date:
+            return rows[i][2]
+    return DEFAULT_MILEAGE_RATE
+
+
+def get_mileage_rate(date):
+    """
+    Get the mileage rate in effect on a date.
+
+    Same result as MileageRateHistory.get_rate_for_date, but served from
+    the versioned rate history cache, so a new rate shows up in every
+    worker straight away.
+
+    Args:
+        date: Date to look up
+
+    Returns:
+        float: Rate per mile
+    """
+    return float(_rate_for_date(_load_mileage_rates(), date))
+
+
+def calculate_job_pay(job_id, include_entries=True):
     """
     Calculate pay breakdown for all technicians on a job.
 
+    Args:
+        job_id: Job ID
+        include_entries: List each technician's time entries. When False
+            the totals are aggregated in SQL without loading the entries,
+            and every 'entries' list is empty.
+
     Returns:
         dict: {
             'job': {...},
@@ -59,9 +159,182 @@ def calculate_job_pay(job_id):
     if not job:
         return None
 
-    # Get all time entries for this job
-    entries = TimeEntry.query.filter_by(job_id=job_id).all()
-    if not entries:
+    if include_entries:
+        # Get all time entries for this job
+        entries = TimeEntry.query.filter_by(job_id=job_id).all()
+
+        # Load every technician on the job and the rate history up front,
+        # instead of a query per time entry
+        techs = _load_technicians({entry.tech_id for entry in entries})
+        rates = _load_mileage_rates()
+        tech_data = _tech_data_from_entries(entries, techs, rates)
+    else:
+        rows = _load_job_totals([job_id]).get(job_id, [])
+        techs = _load_technicians({row.tech_id for row in rows})
+        tech_data = _tech_data_from_totals(rows, techs)
+
+    return _calculate_job_pay(job, tech_data)
+
+
+def _load_technicians(tech_ids):
+    """
+    Load technicians by ID in one query.
+
+    Args:
+        tech_ids: Technician IDs
+
+    Returns:
+        dict: Technician by tech_id
+    """
+    if not tech_ids:
+        return {}
+    return {
+        tech.tech_id: tech
+        for tech in Technician.query.filter(Technician.tech_id.in_(tech_ids)).all()
+    }
+
+
+def _new_tech_data(tech_id, techs):
+    """Start a technician's per-job totals."""
+    tech = techs.get(tech_id)
+    return {
+        'tech_id': tech_id,
+        'tech_name': tech.name if tech else f'Tech #{tech_id}',
+        'min_pay': (tech.hourly_rate or Decimal('0')) if tech else Decimal('0'),
+        'hours': Decimal('0'),
+        'mileage': Decimal('0'),
+        'mileage_pay': Decimal('0'),
+        'per_diem': Decimal('0'),
+        'personal_expenses': Decimal('0'),
+        'entries': []
+    }
+
+
+def _entry_data(entry, mileage_rate):
+    """Serialize a time entry with the mileage rate and pay applied to it."""
+    entry_data = entry.to_dict()
+    entry_data['mileage_rate'] = float(mileage_rate)
+    entry_data['mileage_pay'] = float((entry.mileage or Decimal('0')) * mileage_rate)
+    return entry_data
+
+
+def _tech_data_from_entries(entries, techs, rates):
+    """
+    Total a job's time entries per technician, keeping the entries.
+
+    Args:
+        entries: All time entries for the job
+        techs: Technician by tech_id, covering every entry
+        rates: Mileage rate history as returned by _load_mileage_rates()
+
+    Returns:
+        dict: Per-technician totals by tech_id, in order of first entry
+    """
+    tech_data = {}
+    for entry in entries:
+        tech_id = entry.tech_id
+        data = tech_data.get(tech_id)
+        if data is None:
+            data = tech_data[tech_id] = _new_tech_data(tech_id, techs)
+
+        # Get mileage rate for the date worked
+        mileage_rate = _rate_for_date(rates, entry.date_worked)
+        mileage = entry.mileage or Decimal('0')
+
+        data['entries'].append(_entry_data(entry, mileage_rate))
+        data['hours'] += entry.hours_worked or 0
+        data['mileage'] += mileage
+        data['mileage_pay'] += mileage * mileage_rate
+        data['per_diem'] += entry.per_diem or 0
+        data['personal_expenses'] += entry.personal_expenses or 0
+
+    return tech_data
+
+
+def _load_job_totals(job_ids):
+    """
+    Total time entries per job and technician in one aggregate query.
+
+    Mileage pay is summed in SQL too, using the rate in effect on each
+    entry's date (same rule as MileageRateHistory.get_rate_for_date), so
+    no entry rows are loaded.
+
+    Args:
+        job_ids: Job IDs
+
+    Returns:
+        dict: job_id -> list of per-technician rows, in order of first entry
+    """
+    rate = select(MileageRateHistory.rate_per_mile).where(
+        MileageRateHistory.effective_date <= TimeEntry.date_worked,
+        or_(
+            MileageRateHistory.end_date.is_(None),
+            MileageRateHistory.end_date >= TimeEntry.date_worked
+        )
+    ).order_by(MileageRateHistory.effective_date.desc()).limit(1).scalar_subquery()
+    mileage_rate = func.coalesce(rate, literal(DEFAULT_MILEAGE_RATE, db.Numeric(6, 4)))
+
+    rows = db.session.query(
+        TimeEntry.job_id,
+        TimeEntry.tech_id,
+        func.sum(TimeEntry.hours_worked).label('hours'),
+        func.sum(TimeEntry.mileage).label('mileage'),
+        # mileage (2 places) x rate (4 places) is exact at 6 places
+        type_coerce(
+            func.sum(TimeEntry.mileage * mileage_rate), db.Numeric(16, 6)
+        ).label('mileage_pay'),
+        func.sum(TimeEntry.per_diem).label('per_diem'),
+        func.sum(TimeEntry.personal_expenses).label('personal_expenses')
+    ).filter(
+        TimeEntry.job_id.in_(job_ids)
+    ).group_by(
+        TimeEntry.job_id, TimeEntry.tech_id
+    ).order_by(
+        TimeEntry.job_id, func.min(TimeEntry.entry_id)
+    ).all()
+
+    totals = {}
+    for row in rows:
+        totals.setdefault(row.job_id, []).append(row)
+    return totals
+
+
+def _tech_data_from_totals(rows, techs):
+    """
+    Build per-technician totals from _load_job_totals() rows for one job.
+
+    Args:
+        rows: The job's rows from _load_job_totals()
+        techs: Technician by tech_id, covering every row
+
+    Returns:
+        dict: Per-technician totals by tech_id, without entries
+    """
+    tech_data = {}
+    for row in rows:
+        data = _new_tech_data(row.tech_id, techs)
+        data['hours'] = row.hours or Decimal('0')
+        data['mileage'] = row.mileage or Decimal('0')
+        data['mileage_pay'] = row.mileage_pay or Decimal('0')
+        data['per_diem'] = row.per_diem or Decimal('0')
+        data['personal_expenses'] = row.personal_expenses or Decimal('0')
+        tech_data[row.tech_id] = data
+    return tech_data
+
+
+def _calculate_job_pay(job, tech_data):
+    """
+    Calculate the pay breakdown for a job from per-technician totals.
+
+    Args:
+        job: Job
+        tech_data: Per-technician totals, from _tech_data_from_entries()
+            or _tech_data_from_totals()
+
+    Returns:
+        dict: Same structure as calculate_job_pay()
+    """
+    if not tech_data:
         return {
             'job': job.to_dict(),
             'job_net': 0,
@@ -79,55 +352,26 @@ def calculate_job_pay(job_id):
         }
 
     # Calculate job net
-    billing_amount = Decimal(str(job.billing_amount or 0))
-    expenses = Decimal(str(job.expenses or 0))
-    commissions = Decimal(str(job.commissions or 0))
+    # Numeric columns already load as Decimal, so no str() round-trip
+    billing_amount = job.billing_amount or Decimal('0')
+    expenses = job.expenses or Decimal('0')
+    commissions = job.commissions or Decimal('0')
     job_net = billing_amount - expenses - commissions
 
-    # Group entries by technician
-    tech_data = {}
-    for entry in entries:
-        tech_id = entry.tech_id
-        if tech_id not in tech_data:
-            tech = Technician.query.get(tech_id)
-            tech_data[tech_id] = {
-                'tech_id': tech_id,
-                'tech_name': tech.name if tech else f'Tech #{tech_id}',
-                'min_pay': Decimal(str(tech.hourly_rate or 0)) if tech else Decimal('0'),
-                'hours': Decimal('0'),
-                'mileage': Decimal('0'),
-                'per_diem': Decimal('0'),
-                'personal_expenses': Decimal('0'),
-                'entries': []
-            }
-
-        # Get mileage rate for the date worked
-        mileage_rate = MileageRateHistory.get_rate_for_date(entry.date_worked)
-
-        entry_data = entry.to_dict()
-        entry_data['mileage_rate'] = mileage_rate
-        entry_data['mileage_pay'] = float(Decimal(str(entry.mileage or 0)) * Decimal(str(mileage_rate)))
-
-        tech_data[tech_id]['entries'].append(entry_data)
-        tech_data[tech_id]['hours'] += Decimal(str(entry.hours_worked or 0))
-        tech_data[tech_id]['mileage'] += Decimal(str(entry.mileage or 0))
-        tech_data[tech_id]['per_diem'] += Decimal(str(entry.per_diem or 0))
-        tech_data[tech_id]['personal_expenses'] += Decimal(str(entry.personal_expenses or 0))
-
-    # Calculate total deductions (mileage pay + per diem + personal expenses for all techs)
+    # Deductions (mileage pay + per diem + personal expenses for all techs),
+    # total hours and the min_pay × hours weighted sum, in one pass
     total_mileage_pay = Decimal('0')
     total_per_diem = Decimal('0')
     total_personal_expenses = Decimal('0')
+    total_hours = Decimal('0')
+    weighted_sum = Decimal('0')
 
-    for tech_id, data in tech_data.items():
-        # Calculate mileage pay for this tech
-        mileage_pay = Decimal('0')
-        for entry in data['entries']:
-            mileage_pay += Decimal(str(entry['mileage_pay']))
-        data['mileage_pay'] = mileage_pay
-        total_mileage_pay += mileage_pay
+    for data in tech_data.values():
+        total_mileage_pay += data['mileage_pay']
         total_per_diem += data['per_diem']
         total_personal_expenses += data['personal_expenses']
+        total_hours += data['hours']
+        weighted_sum += data['min_pay'] * data['hours']
 
     total_deductions = total_mileage_pay + total_per_diem + total_personal_expenses
 
@@ -136,10 +380,6 @@ def calculate_job_pay(job_id):
     if tech_pool < 0:
         tech_pool = Decimal('0')
 
-    # Calculate total hours and weighted sum
-    total_hours = sum(data['hours'] for data in tech_data.values())
-    weighted_sum = sum(data['min_pay'] * data['hours'] for data in tech_data.values())
-
     # Calculate base pay for each tech
     technicians = []
     total_base_pay = Decimal('0')
@@ -224,7 +464,7 @@ def calculate_job_pay(job_id):
     }
 
 
-def calculate_tech_pay_summary(tech_id, start_date=None, end_date=None):
+def calculate_tech_pay_summary(tech_id, start_date=None, end_date=None, include_entries=True):
     """
     Calculate pay summary for a technician over a date range.
 
@@ -232,23 +472,43 @@ def calculate_tech_pay_summary(tech_id, start_date=None, end_date=None):
         tech_id: Technician ID
         start_date: Start date filter (optional)
         end_date: End date filter (optional)
+        include_entries: List the technician's time entries on each job;
+            when False each 'entries' list is empty and no entries are loaded
 
     Returns:
         dict: Summary of all pay for the technician
     """
-    from sqlalchemy import and_
-
-    query = TimeEntry.query.filter_by(tech_id=tech_id)
+    query = db.session.query(TimeEntry.job_id).filter(TimeEntry.tech_id == tech_id)
 
     if start_date:
         query = query.filter(TimeEntry.date_worked >= start_date)
     if end_date:
         query = query.filter(TimeEntry.date_worked <= end_date)
 
-    entries = query.all()
-
-    # Group by job
-    job_ids = set(entry.job_id for entry in entries)
+    # Jobs the tech worked in the range
+    job_ids = set(job_id for job_id, in query.distinct())
+
+    # Job pay depends on every tech's totals on the job: aggregate them for
+    # all jobs in SQL, and load only this tech's entries for the breakdown
+    jobs = {}
+    totals_by_job = {}
+    own_entries = {}
+    if job_ids:
+        jobs = {
+            job.job_id: job
+            for job in Job.query.options(selectinload(Job.platform)).filter(Job.job_id.in_(job_ids))
+        }
+        totals_by_job = _load_job_totals(job_ids)
+    techs = _load_technicians({row.tech_id for rows in totals_by_job.values() for row in rows})
+
+    if job_ids and include_entries:
+        rates = _load_mileage_rates()
+        for entry in TimeEntry.query.filter(
+            TimeEntry.tech_id == tech_id, TimeEntry.job_id.in_(job_ids)
+        ).all():
+            own_entries.setdefault(entry.job_id, []).append(
+                _entry_data(entry, _rate_for_date(rates, entry.date_worked))
+            )
 
     jobs_pay = []
     totals = {
@@ -261,8 +521,13 @@ def calculate_tech_pay_summary(tech_id, start_date=None, end_date=None):
     }
 
     for job_id in job_ids:
-        job_pay = calculate_job_pay(job_id)
-        if job_pay:
+        job = jobs.get(job_id)
+        if job:
+            tech_data = _tech_data_from_totals(totals_by_job.get(job_id, []), techs)
+            if tech_id in tech_data:
+                tech_data[tech_id]['entries'] = own_entries.get(job_id, [])
+            job_pay = _calculate_job_pay(job, tech_data)
+
             # Find this tech's data in the job pay breakdown
             for tech in job_pay['technicians']:
                 if tech['tech_id'] == tech_id:
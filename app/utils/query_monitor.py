@@ -0,0 +1,57 @@
+"""
+N+1 query detection for development and testing.
+Flags relationships that are lazy-loaded repeatedly within one request,
+which usually means a loop is missing a selectinload/joinedload option.
+"""
+from flask import current_app, g, has_request_context
+from sqlalchemy import event
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class NPlusOneError(Exception):
+    """Raised when a repeated lazy load is detected and NPLUSONE_RAISE is set."""
+
+
+def _check_lazy_load(orm_execute_state):
+    """Track lazy relationship loads per request and report repeats."""
+    if not orm_execute_state.is_select or not has_request_context():
+        return
+
+    if orm_execute_state.lazy_loaded_from is None:
+        return
+
+    if not current_app.config.get('NPLUSONE_ENABLED', False):
+        return
+
+    path = orm_execute_state.loader_strategy_path
+    if path is None:
+        return
+
+    relationship = str(path[-1])
+    lazy_loads = g.setdefault('_lazy_loads', {})
+    parents = lazy_loads.setdefault(relationship, set())
+    parents.add(orm_execute_state.lazy_loaded_from.identity_key)
+
+    # Lazy loading a relationship on one object is normal; loading it on a
+    # second object in the same request means it is being loaded per row.
+    if len(parents) == 2:
+        message = f"Potential n+1 query detected on {relationship}"
+        if current_app.config.get('NPLUSONE_RAISE', False):
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+def init_query_monitor(app, db):
+    """
+    Enable N+1 lazy-load detection for the application.
+
+    Args:
+        app: Flask application instance
+        db: Flask-SQLAlchemy extension instance
+    """
+    if not event.contains(db.session, 'do_orm_execute', _check_lazy_load):
+        event.listen(db.session, 'do_orm_execute', _check_lazy_load)
+
+    logger.info("N+1 query detection enabled")
@@ -0,0 +1,147 @@
+"""
+Helpers for creating user accounts linked to technicians.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app import db, bcrypt
+from app.models import Technician, User
+from app.utils.logging import get_logger, audit_logger
+
+logger = get_logger(__name__)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def hash_password(password):
+    """
+    Hash a password with the configured bcrypt cost (BCRYPT_LOG_ROUNDS).
+
+    Kept separate from create_user_for_tech() so callers can hash before
+    adding rows to the session, keeping the slow bcrypt call out of the
+    window where the pending inserts hold a pooled connection.
+
+    Args:
+        password: Plain-text password (already strength-validated)
+
+    Returns:
+        str: bcrypt password hash
+    """
+    return bcrypt.generate_password_hash(password).decode('utf-8')
+
+
+def create_user_for_tech(tech, email, password_hash):
+    """
+    Add a technician-role user account linked to a technician.
+
+    The caller is responsible for committing the session.
+
+    Args:
+        tech: Technician the account belongs to (must have a tech_id)
+        email: Login email for the account
+        password_hash: Hash from hash_password()
+
+    Returns:
+        User: The new (uncommitted) user
+    """
+    user = User(
+        email=email,
+        password_hash=password_hash,
+        full_name=tech.name,
+        role='technician',
+        tech_id=tech.tech_id,
+        password_changed_at=datetime.utcnow()
+    )
+    db.session.add(user)
+    return user
+
+
+def _get_executor():
+    """Return the provisioning thread pool, recreating it after a fork."""
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor_pid != pid:
+        with _executor_lock:
+            if _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('USER_PROVISIONING_WORKERS', 2),
+                    thread_name_prefix='user-provisioning'
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def _audit_provisioning_failure(tech_id, email, created_by, reason):
+    """Record a failed background account creation in the audit trail."""
+    try:
+        audit_logger.log(
+            action_type='user_provisioning_failed',
+            entity_type='technician',
+            entity_id=tech_id,
+            new_values={'email': email, 'tech_id': tech_id},
+            description=f"User account for technician {tech_id} was not created: {reason}",
+            user_id=created_by
+        )
+    except Exception:
+        logger.exception(f"Could not record provisioning failure for technician {tech_id}")
+
+
+def _provision_user(app, tech_id, email, password, created_by):
+    """Hash the password and create the technician's user account."""
+    with app.app_context():
+        try:
+            tech = db.session.get(Technician, tech_id)
+            if tech is None:
+                logger.error(f"User provisioning failed: technician {tech_id} not found")
+                _audit_provisioning_failure(tech_id, email, created_by, 'technician not found')
+                return
+
+            user = create_user_for_tech(tech, email, hash_password(password))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                reason = f'a user with email {email} already exists'
+                logger.error(f"User provisioning failed for technician {tech_id}: {reason}")
+                _audit_provisioning_failure(tech_id, email, created_by, reason)
+                return
+
+            logger.info(f"User account created for technician: {tech_id}")
+            audit_logger.log(
+                action_type='user_created_for_technician',
+                entity_type='user',
+                entity_id=user.user_id,
+                new_values={'email': email, 'tech_id': tech_id},
+                description=f"User account created for technician {tech.name}",
+                user_id=created_by
+            )
+        except Exception as e:
+            db.session.rollback()
+            logger.exception(f"User provisioning failed for technician {tech_id}")
+            _audit_provisioning_failure(tech_id, email, created_by, str(e))
+
+
+def enqueue_user_provisioning(tech_id, email, password, created_by):
+    """
+    Create a technician's user account in a background thread.
+
+    The bcrypt hash, user insert and audit entry run off the request thread.
+    Callers validate the password and check the email first, so the only
+    expected failure is a concurrent create with the same email. Failures
+    are recorded in the audit trail as user_provisioning_failed. Clients see
+    the account once get_technician reports has_user_account.
+
+    Args:
+        tech_id: ID of the (committed) technician
+        email: Login email for the account
+        password: Plain-text password (already strength-validated)
+        created_by: ID of the user requesting the account
+    """
+    app = current_app._get_current_object()
+    _get_executor().submit(_provision_user, app, tech_id, email, password, created_by)
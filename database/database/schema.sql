@@ -182,6 +182,8 @@ CREATE TABLE users (
       password_changed_at TIMESTAMP NULL,
 
     FOREIGN KEY (tech_id) REFERENCES technicians(tech_id),
+      -- One user account per technician (same key as migration 006)
+      UNIQUE INDEX idx_tech_id (tech_id),
       INDEX idx_email (email),
       INDEX idx_role (role),
       INDEX idx_status (status)
@@ -0,0 +1,19 @@
+-- Migration: Add indexes for hot filter columns
+-- Date: 2026-10-15
+-- Description: Index the columns filtered on by the technician and settings routes.
+--              system_settings.setting_key, technicians.email and users.email are
+--              already UNIQUE (and therefore indexed).
+
+-- One user account per technician; also serves the tech_id -> user lookups.
+-- Fails if duplicates exist - find them first with:
+--   SELECT tech_id, COUNT(*) FROM users WHERE tech_id IS NOT NULL GROUP BY tech_id HAVING COUNT(*) > 1;
+ALTER TABLE users ADD UNIQUE INDEX idx_tech_id (tech_id);
+
+-- Technician list filters by status and sorts by name; replaces idx_status (its prefix)
+ALTER TABLE technicians
+DROP INDEX idx_status,
+ADD INDEX idx_status_name (status, name);
+
+-- Open-ended rate lookup (end_date IS NULL AND effective_date < ?).
+-- MySQL has no partial indexes, so lead with end_date to get the same range scan.
+ALTER TABLE mileage_rate_history ADD INDEX idx_open_rate (end_date, effective_date);
@@ -0,0 +1,15 @@
+-- Migration: Add composite indexes for time entry filters
+-- Date: 2026-10-15
+-- Description: Time entry lists filter by technician or status and order by
+--              date_worked DESC. Composite indexes let MySQL range-scan in date
+--              order (reading the index backwards for DESC) instead of filtering
+--              on a single-column index and sorting. period_id is already
+--              indexed (idx_period_id).
+
+-- Each composite replaces the single-column index that is its prefix. Both
+-- changes run in one ALTER so the tech_id foreign key always has an index.
+ALTER TABLE time_entries
+DROP INDEX idx_tech_id,
+ADD INDEX idx_tech_date (tech_id, date_worked),
+DROP INDEX idx_status,
+ADD INDEX idx_status_date (status, date_worked);
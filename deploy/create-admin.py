@@ -5,6 +5,10 @@ Run from the application directory with the virtual environment activated:
     cd /opt/work-tracking
     source venv/bin/activate
     python deploy/create-admin.py
+
+The password is hashed with the app's bcrypt cost (BCRYPT_LOG_ROUNDS), the
+same one used when users log in, so the admin hash matches every other
+account.
 """
 import sys
 import os
@@ -13,8 +17,9 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from getpass import getpass
-from app import create_app, db, bcrypt
+from app import create_app, db
 from app.models import User
+from app.utils.users import hash_password
 
 
 def create_admin():
@@ -46,7 +51,7 @@ def create_admin():
             print("Password must be at least 8 characters")
             return
 
-        password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        password_hash = hash_password(password)
 
         user = User(
             email=email,
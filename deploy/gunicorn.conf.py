@@ -6,11 +6,14 @@ import multiprocessing
 # Bind to localhost - nginx handles external connections
 bind = "127.0.0.1:8000"
 
-# Workers - for a small VM, 2-4 workers is usually sufficient
-workers = 2
+# Workers - one process per CPU (at least 2); each serves `threads` requests
+# concurrently, so a request waiting on MySQL or disk no longer blocks a whole
+# worker. Keep DB_POOL_SIZE >= threads so every thread can hold a connection.
+workers = max(2, multiprocessing.cpu_count())
 
 # Worker class
-worker_class = "sync"
+worker_class = "gthread"
+threads = 8
 
 # Timeout for worker processes (seconds)
 timeout = 120
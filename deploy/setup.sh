@@ -35,13 +35,16 @@ apt-get install -y \
     python3-venv \
     nginx \
     mysql-server \
+    redis-server \
     git \
     curl
 
 echo ""
-echo "[3/7] Setting up MySQL..."
+echo "[3/7] Setting up MySQL and Redis..."
 systemctl start mysql
 systemctl enable mysql
+systemctl start redis-server
+systemctl enable redis-server
 
 # Generate random password for DB user
 DB_PASS=$(openssl rand -base64 16 | tr -dc 'a-zA-Z0-9' | head -c 16)
@@ -104,6 +107,9 @@ DB_NAME=${DB_NAME}
 DB_USER=${DB_USER}
 DB_PASSWORD=${DB_PASS}
 
+# Cache
+CACHE_REDIS_URL=redis://localhost:6379/0
+
 # JWT Configuration
 JWT_SECRET_KEY=${JWT_SECRET}
 JWT_ACCESS_TOKEN_EXPIRES=3600
@@ -112,6 +118,8 @@ JWT_REFRESH_TOKEN_EXPIRES=604800
 # Logging
 LOG_LEVEL=INFO
 LOG_FILE=/var/log/work-tracking/app.log
+# Rotation is done by logrotate (deploy/logrotate.conf), not by the workers
+LOG_MAX_BYTES=0
 
 # Security
 BCRYPT_LOG_ROUNDS=12
@@ -145,6 +153,10 @@ systemctl daemon-reload
 systemctl enable work-tracking
 systemctl start work-tracking
 
+# Setup log rotation
+cp ${APP_DIR}/deploy/logrotate.conf /etc/logrotate.d/work-tracking
+chmod 644 /etc/logrotate.d/work-tracking
+
 # Setup nginx
 cp ${APP_DIR}/deploy/nginx.conf /etc/nginx/sites-available/work-tracking
 ln -sf /etc/nginx/sites-available/work-tracking /etc/nginx/sites-enabled/
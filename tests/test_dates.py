@@ -0,0 +1,34 @@
+"""
+Tests for the date parsing helpers.
+"""
+from datetime import time
+
+import pytest
+
+from app.utils.dates import parse_hhmm
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('08:30', time(8, 30)),
+    ('8:05', time(8, 5)),
+    ('23:59', time(23, 59)),
+])
+def test_parse_hhmm_valid(value, expected):
+    assert parse_hhmm(value) == expected
+
+
+@pytest.mark.parametrize('value', [None, ''])
+def test_parse_hhmm_empty(value):
+    assert parse_hhmm(value) is None
+
+
+@pytest.mark.parametrize('value', ['0830', '8:3:0', 'ab:cd', '24:00', '123:00'])
+def test_parse_hhmm_invalid_string(value):
+    with pytest.raises(ValueError):
+        parse_hhmm(value)
+
+
+@pytest.mark.parametrize('value', [930, 9.5, ['09:30'], {'h': 9}, True])
+def test_parse_hhmm_non_string_raises_value_error(value):
+    with pytest.raises(ValueError):
+        parse_hhmm(value)